@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Create the performance indexes declared on the ORM models
+Run with: python add_indexes.py
+
+Base.metadata.create_all skips tables that already exist, so deployed
+databases never pick up Index() declarations added after the table was
+first created. This applies them with CREATE INDEX CONCURRENTLY, which
+builds without blocking writes.
+"""
+import os
+import psycopg2
+
+# Get database URL from environment variable or set it here
+DATABASE_URL = ""
+
+if not DATABASE_URL:
+    print("❌ ERROR: DATABASE_URL not set!")
+    print("Set it at the top of this file or as environment variable")
+    exit(1)
+
+try:
+    print("=" * 60)
+    print("DATABASE MIGRATION: Create Performance Indexes")
+    print("=" * 60)
+    print()
+    print("🔗 Connecting to database...")
+
+    conn = psycopg2.connect(DATABASE_URL)
+    # CONCURRENTLY cannot run inside a transaction block
+    conn.autocommit = True
+    cursor = conn.cursor()
+
+    print("✓ Connected successfully")
+    print()
+
+    # Keep in sync with the Index() declarations in app/models/
+    migrations = [
+        # drivers: matching only scans online, approved drivers with a location
+        """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_drivers_online_approved
+        ON drivers (current_latitude, current_longitude)
+        WHERE is_online = true AND approval_status = 'approved'
+          AND current_latitude IS NOT NULL;
+        """,
+        # tow_requests: driver history (keyset pagination on created_at)
+        """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tow_requests_driver_created
+        ON tow_requests (driver_id, created_at);
+        """,
+        # tow_requests: earnings aggregates and active-tow lookups
+        """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tow_requests_driver_status
+        ON tow_requests (driver_id, status);
+        """,
+        # tow_requests: customer history
+        """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tow_requests_customer_created
+        ON tow_requests (customer_id, created_at);
+        """,
+        # tow_requests: /driver/active poll — in-progress rows only
+        """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tow_requests_driver_active
+        ON tow_requests (driver_id, created_at)
+        WHERE status IN ('accepted', 'en_route_pickup', 'arrived_pickup',
+                         'vehicle_loaded', 'en_route_dropoff', 'arrived_dropoff');
+        """,
+        # tow_requests: status-scoped listings (admin dashboards, reporting)
+        """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tow_requests_status_requested
+        ON tow_requests (status, requested_at);
+        """,
+        # tow_requests: dispatcher hot set — undispatched tows by age
+        """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tow_requests_pending_requested
+        ON tow_requests (requested_at)
+        WHERE status IN ('pending', 'searching');
+        """,
+        # tow_request_offers: pending-offer lookups per driver
+        """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_offers_driver_response_offered
+        ON tow_request_offers (driver_id, response, offered_at);
+        """,
+        # location_history: BRIN over the append-only timestamp
+        """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_location_history_recorded_brin
+        ON location_history USING brin (recorded_at);
+        """,
+        # location_history: per-driver track reads
+        """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_location_history_driver_time
+        ON location_history (driver_id, recorded_at);
+        """,
+        # transactions: driver earnings aggregates
+        """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_driver_type_created
+        ON transactions (driver_id, transaction_type, created_at);
+        """,
+        # vehicles: GIN for can_tow_types @> containment in matching
+        """
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_vehicles_can_tow_gin
+        ON vehicles USING gin (can_tow_types);
+        """,
+    ]
+
+    print("Starting database migration...")
+    print()
+
+    for i, migration in enumerate(migrations, 1):
+        try:
+            cursor.execute(migration)
+            print(f"✅ Migration {i}/{len(migrations)} completed")
+        except Exception as e:
+            print(f"❌ Migration {i} failed: {e}")
+
+    print()
+    print("✅ All migrations completed!")
+    print()
+
+    # Verify the indexes exist
+    print("🔍 Verifying indexes...")
+    print()
+
+    cursor.execute("""
+        SELECT tablename, indexname
+        FROM pg_indexes
+        WHERE indexname IN (
+            'idx_drivers_online_approved',
+            'idx_tow_requests_driver_created',
+            'idx_tow_requests_driver_status',
+            'idx_tow_requests_customer_created',
+            'idx_tow_requests_driver_active',
+            'idx_tow_requests_status_requested',
+            'idx_tow_requests_pending_requested',
+            'idx_offers_driver_response_offered',
+            'idx_location_history_recorded_brin',
+            'idx_location_history_driver_time',
+            'idx_transactions_driver_type_created',
+            'ix_vehicles_can_tow_gin'
+        )
+        ORDER BY tablename, indexname;
+    """)
+
+    rows = cursor.fetchall()
+
+    if rows:
+        print("✅ VERIFICATION - Indexes present:")
+        print("-" * 60)
+        print(f"{'TABLE':<25} {'INDEX':<40}")
+        print("-" * 60)
+        for tablename, indexname in rows:
+            print(f"{tablename:<25} {indexname:<40}")
+    else:
+        print("❌ VERIFICATION FAILED - no indexes found")
+
+    cursor.close()
+    conn.close()
+
+    print()
+    print("=" * 60)
+    print("MIGRATION COMPLETE")
+    print("=" * 60)
+
+except Exception as e:
+    print(f"❌ Migration failed: {e}")
+    exit(1)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Add running-average rating fields to Driver table
+Run with: python add_rating_fields.py
+"""
+import os
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+# Get database URL from environment variable or set it here
+DATABASE_URL = ""
+
+if not DATABASE_URL:
+    print("❌ ERROR: DATABASE_URL not set!")
+    print("Set it at the top of this file or as environment variable")
+    exit(1)
+
+try:
+    print("=" * 60)
+    print("DATABASE MIGRATION: Add Driver Rating Aggregate Fields")
+    print("=" * 60)
+    print()
+    print("🔗 Connecting to database...")
+
+    conn = psycopg2.connect(DATABASE_URL)
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+
+    print("✓ Connected successfully")
+    print()
+
+    migrations = [
+        # Running-average inputs so rate_tow can update the driver rating
+        # with one O(1) UPDATE instead of re-averaging their whole history.
+        """
+        ALTER TABLE drivers
+        ADD COLUMN IF NOT EXISTS rating_sum NUMERIC(10, 2) DEFAULT 0,
+        ADD COLUMN IF NOT EXISTS rating_count INTEGER DEFAULT 0;
+        """,
+        # One-time backfill from existing ratings.
+        """
+        UPDATE drivers d SET
+            rating_sum = COALESCE(agg.s, 0),
+            rating_count = COALESCE(agg.c, 0)
+        FROM (
+            SELECT driver_id, SUM(driver_rating) AS s, COUNT(driver_rating) AS c
+            FROM tow_requests
+            WHERE driver_rating IS NOT NULL
+            GROUP BY driver_id
+        ) agg
+        WHERE agg.driver_id = d.id;
+        """,
+    ]
+
+    print("Starting database migration...")
+    print()
+
+    for i, migration in enumerate(migrations, 1):
+        try:
+            cursor.execute(migration)
+            conn.commit()
+            print(f"✅ Migration {i}/{len(migrations)} completed")
+        except Exception as e:
+            print(f"❌ Migration {i} failed: {e}")
+            conn.rollback()
+
+    print()
+    print("✅ All migrations completed!")
+    print()
+
+    # Verify the new fields were added
+    print("🔍 Verifying new columns...")
+    print()
+
+    cursor.execute("""
+        SELECT column_name, data_type, is_nullable, column_default
+        FROM information_schema.columns
+        WHERE table_name = 'drivers'
+        AND column_name IN ('rating_sum', 'rating_count')
+        ORDER BY column_name;
+    """)
+
+    rows = cursor.fetchall()
+
+    if rows:
+        print("✅ VERIFICATION - New columns added:")
+        print("-" * 80)
+        print(f"{'COLUMN':<20} {'TYPE':<20} {'NULLABLE':<10} {'DEFAULT':<20}")
+        print("-" * 80)
+        for row in rows:
+            nullable = "YES" if row['is_nullable'] == 'YES' else "NO"
+            default = str(row['column_default'])[:20] if row['column_default'] else '-'
+            print(f"{row['column_name']:<20} {row['data_type']:<20} {nullable:<10} {default:<20}")
+    else:
+        print("⚠️  Warning: Could not verify new columns")
+
+    print()
+    print("=" * 60)
+    print("Migration complete! Driver ratings now update incrementally.")
+    print("=" * 60)
+
+    cursor.close()
+    conn.close()
+
+except psycopg2.Error as e:
+    print(f"❌ Database error: {e}")
+    exit(1)
+except Exception as e:
+    print(f"❌ Error: {e}")
+    import traceback
+    traceback.print_exc()
+    exit(1)
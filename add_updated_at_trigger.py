@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Maintain updated_at with a database trigger instead of SQLAlchemy onupdate
+Run with: python add_updated_at_trigger.py
+"""
+import os
+import psycopg2
+
+# Get database URL from environment variable or set it here
+DATABASE_URL = ""
+
+if not DATABASE_URL:
+    print("❌ ERROR: DATABASE_URL not set!")
+    print("Set it at the top of this file or as environment variable")
+    exit(1)
+
+# Tables that carry an updated_at column
+TABLES = ["users", "drivers", "tow_requests"]
+
+try:
+    print("=" * 60)
+    print("DATABASE MIGRATION: updated_at trigger")
+    print("=" * 60)
+    print()
+    print("🔗 Connecting to database...")
+
+    conn = psycopg2.connect(DATABASE_URL)
+    cursor = conn.cursor()
+
+    print("✓ Connected successfully")
+    print()
+
+    migrations = [
+        """
+        CREATE OR REPLACE FUNCTION set_updated_at()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.updated_at = NOW();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+        """,
+    ]
+    for table in TABLES:
+        migrations.append(f"DROP TRIGGER IF EXISTS trg_{table}_updated_at ON {table};")
+        migrations.append(
+            f"""
+            CREATE TRIGGER trg_{table}_updated_at
+            BEFORE UPDATE ON {table}
+            FOR EACH ROW
+            EXECUTE FUNCTION set_updated_at();
+            """
+        )
+
+    print("Starting database migration...")
+    print()
+
+    for i, migration in enumerate(migrations, 1):
+        try:
+            cursor.execute(migration)
+            conn.commit()
+            print(f"✅ Migration {i}/{len(migrations)} completed")
+        except Exception as e:
+            print(f"❌ Migration {i} failed: {e}")
+            conn.rollback()
+
+    print()
+    print("✅ All migrations completed!")
+    print()
+
+    # Verify the triggers exist
+    print("🔍 Verifying triggers...")
+    print()
+
+    cursor.execute("""
+        SELECT event_object_table, trigger_name
+        FROM information_schema.triggers
+        WHERE trigger_name LIKE 'trg_%_updated_at'
+        ORDER BY event_object_table;
+    """)
+
+    rows = cursor.fetchall()
+
+    print("-" * 60)
+    print(f"{'TABLE':<28} {'TRIGGER':<30}")
+    print("-" * 60)
+    for table_name, trigger_name in rows:
+        print(f"{table_name:<28} {trigger_name:<30}")
+
+    print()
+    print("=" * 60)
+    print("Migration complete! updated_at is now trigger-maintained.")
+    print("=" * 60)
+
+    cursor.close()
+    conn.close()
+
+except psycopg2.Error as e:
+    print(f"❌ Database error: {e}")
+    exit(1)
+except Exception as e:
+    print(f"❌ Error: {e}")
+    import traceback
+    traceback.print_exc()
+    exit(1)
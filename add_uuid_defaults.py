@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Move UUID primary key generation into Postgres (gen_random_uuid)
+Run with: python add_uuid_defaults.py
+"""
+import os
+import psycopg2
+
+# Get database URL from environment variable or set it here
+DATABASE_URL = ""
+
+if not DATABASE_URL:
+    print("❌ ERROR: DATABASE_URL not set!")
+    print("Set it at the top of this file or as environment variable")
+    exit(1)
+
+# Tables whose id column should default to gen_random_uuid()
+TABLES = [
+    "users",
+    "drivers",
+    "vehicles",
+    "tow_requests",
+    "tow_request_offers",
+    "transactions",
+    "support_tickets",
+    "support_messages",
+    "notifications",
+    "promo_codes",
+    "service_types",
+    "customer_vehicle_types",
+    "tow_reasons",
+]
+
+try:
+    print("=" * 60)
+    print("DATABASE MIGRATION: Server-side UUID defaults")
+    print("=" * 60)
+    print()
+    print("🔗 Connecting to database...")
+
+    conn = psycopg2.connect(DATABASE_URL)
+    cursor = conn.cursor()
+
+    print("✓ Connected successfully")
+    print()
+
+    # gen_random_uuid() is built in on PG 13+; pgcrypto covers older servers
+    migrations = ["CREATE EXTENSION IF NOT EXISTS pgcrypto;"]
+    migrations += [
+        f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT gen_random_uuid();"
+        for table in TABLES
+    ]
+
+    print("Starting database migration...")
+    print()
+
+    for i, migration in enumerate(migrations, 1):
+        try:
+            cursor.execute(migration)
+            conn.commit()
+            print(f"✅ Migration {i}/{len(migrations)} completed")
+        except Exception as e:
+            print(f"❌ Migration {i} failed: {e}")
+            conn.rollback()
+
+    print()
+    print("✅ All migrations completed!")
+    print()
+
+    # Verify the defaults took
+    print("🔍 Verifying id defaults...")
+    print()
+
+    cursor.execute("""
+        SELECT table_name, column_default
+        FROM information_schema.columns
+        WHERE table_name = ANY(%s)
+        AND column_name = 'id'
+        ORDER BY table_name;
+    """, (TABLES,))
+
+    rows = cursor.fetchall()
+
+    print("-" * 60)
+    print(f"{'TABLE':<28} {'DEFAULT':<30}")
+    print("-" * 60)
+    for table_name, default in rows:
+        print(f"{table_name:<28} {str(default)[:30]:<30}")
+
+    print()
+    print("=" * 60)
+    print("Migration complete! Postgres now generates primary keys.")
+    print("=" * 60)
+
+    cursor.close()
+    conn.close()
+
+except psycopg2.Error as e:
+    print(f"❌ Database error: {e}")
+    exit(1)
+except Exception as e:
+    print(f"❌ Error: {e}")
+    import traceback
+    traceback.print_exc()
+    exit(1)
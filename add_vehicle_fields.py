@@ -29,19 +29,13 @@ try:
     print()
     
     migrations = [
-        # Add boolean fields for special vehicle requirements
+        # Add boolean fields for special vehicle requirements.
+        # One batched ALTER TABLE = one table lock + one catalog update
+        # instead of three.
         """
-        ALTER TABLE tow_requests 
-        ADD COLUMN IF NOT EXISTS is_awd BOOLEAN DEFAULT FALSE;
-        """,
-        
-        """
-        ALTER TABLE tow_requests 
-        ADD COLUMN IF NOT EXISTS is_lowered BOOLEAN DEFAULT FALSE;
-        """,
-        
-        """
-        ALTER TABLE tow_requests 
+        ALTER TABLE tow_requests
+        ADD COLUMN IF NOT EXISTS is_awd BOOLEAN DEFAULT FALSE,
+        ADD COLUMN IF NOT EXISTS is_lowered BOOLEAN DEFAULT FALSE,
         ADD COLUMN IF NOT EXISTS is_damaged BOOLEAN DEFAULT FALSE;
         """,
     ]
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.database import get_db
+from sqlalchemy import select, or_
+from app.database import get_db, async_session_maker
 from datetime import datetime, timedelta
+import asyncio
 import stripe
 from app.config import settings  # Line 6
 from typing import Optional
@@ -14,33 +15,38 @@ from app.dependencies import get_current_user, get_current_customer, get_current
 from app.services.auth_service import AuthService
 from app.services.notification_service import NotificationService
 from app.models import User
-from uuid import uuid4
+from app.utils.cache import TTLCache
+from app.utils.schema import construct_trusted
+from uuid import UUID, uuid4
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
+# Short-TTL cache for the refresh-token user lookup. Mobile clients hit
+# /auth/refresh often; the user row changes rarely, so a 60s window saves a
+# DB round-trip per call without meaningfully delaying deactivations.
+_refresh_user_cache = TTLCache(maxsize=10_000, ttl=60)
+
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: UserCreate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
     """Register a new user"""
-    # Check if email already exists
+    # Check email and phone conflicts in a single query
     result = await db.execute(
-        select(User).where(User.email == user_data.email)
-    )
-    if result.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
+        select(User.email, User.phone).where(
+            or_(User.email == user_data.email, User.phone == user_data.phone)
         )
-    
-    # Check if phone already exists
-    result = await db.execute(
-        select(User).where(User.phone == user_data.phone)
     )
-    if result.scalar_one_or_none():
+    for row in result.all():
+        if row.email == user_data.email:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Phone number already registered"
@@ -69,11 +75,12 @@ async def register(
             raise HTTPException(status_code=400, detail=f"Payment error: {str(e)}")
     
     
-    # Create user
+    # Create user (hashing is CPU-bound, keep it off the event loop)
+    password_hash = await asyncio.to_thread(AuthService.hash_password, user_data.password)
     user = User(
         email=user_data.email,
         phone=user_data.phone,
-        password_hash=AuthService.hash_password(user_data.password),
+        password_hash=password_hash,
         role=user_data.role,
         first_name=user_data.first_name,
         last_name=user_data.last_name,
@@ -84,11 +91,10 @@ async def register(
     
     db.add(user)
     await db.commit()
-    await db.refresh(user)
-    
-    # Send welcome email
-    notification_service = NotificationService(db)
-    await notification_service.send_welcome_email(user.id)
+
+    # Send welcome email after the response — email delivery shouldn't
+    # block registration
+    background_tasks.add_task(_send_welcome_email, user.id)
     
     # Generate tokens
     access_token = AuthService.create_access_token({"sub": str(user.id)})
@@ -97,9 +103,17 @@ async def register(
     return TokenResponse(
         access_token=access_token,
         refresh_token=refresh_token,
-        user=UserResponse.from_orm(user)
+        user=construct_trusted(UserResponse, user)
     )
-    
+
+async def _send_welcome_email(user_id: UUID):
+    """
+    Background welcome email. Opens its own session — background tasks
+    run after the request's get_db session has closed.
+    """
+    async with async_session_maker() as session:
+        await NotificationService(session).send_welcome_email(user_id)
+
 @router.get("/me", response_model=UserResponse)
 async def get_me(
     current_user: User = Depends(get_current_user)
@@ -135,7 +149,7 @@ async def login(
     return TokenResponse(
         access_token=access_token,
         refresh_token=refresh_token,
-        user=UserResponse.from_orm(user)
+        user=construct_trusted(UserResponse, user)
     )
 
 @router.post("/refresh", response_model=TokenResponse)
@@ -153,17 +167,21 @@ async def refresh_token(
         )
     
     user_id = payload.get("sub")
-    result = await db.execute(
-        select(User).where(User.id == user_id, User.is_active == True)
-    )
-    user = result.scalar_one_or_none()
-    
+    user = _refresh_user_cache.get(user_id)
+    if user is None:
+        # Primary-key fetch — hits the identity map and skips WHERE compilation
+        user = await db.get(User, UUID(user_id))
+        if user and not user.is_active:
+            user = None
+        if user:
+            _refresh_user_cache.set(user_id, user)
+
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
-    
+
     # Generate new tokens
     new_access_token = AuthService.create_access_token({"sub": str(user.id)})
     new_refresh_token = AuthService.create_refresh_token({"sub": str(user.id)})
@@ -171,12 +189,13 @@ async def refresh_token(
     return TokenResponse(
         access_token=new_access_token,
         refresh_token=new_refresh_token,
-        user=UserResponse.from_orm(user)
+        user=construct_trusted(UserResponse, user)
     )
 
 @router.post("/forgot-password")
 async def forgot_password(
     request: PasswordResetRequest,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
     """Request password reset"""
@@ -185,7 +204,10 @@ async def forgot_password(
     )
     user = result.scalar_one_or_none()
     
-    # Always return success to prevent email enumeration
+    # Always return success to prevent email enumeration. With the reset
+    # email backgrounded, the real branch only encodes a JWT (microseconds),
+    # so no compensating work is needed here — both branches are dominated
+    # by the SELECT above and time alike.
     if not user:
         return {"message": "If the email exists, a reset link has been sent"}
     
@@ -195,16 +217,17 @@ async def forgot_password(
         expires_delta=timedelta(hours=1)
     )
     
-    # Send reset email
+    # Send reset email after the response
     notification_service = NotificationService(db)
     reset_url = f"{settings.WEB_URL}/reset-password?token={reset_token}"
-    
-    await notification_service._send_email(
+
+    background_tasks.add_task(
+        notification_service._send_email,
         user.email,
         "Password Reset Request",
         f"Click here to reset your password: {reset_url}"
     )
-    
+
     return {"message": "If the email exists, a reset link has been sent"}
 
 @router.post("/reset-password")
@@ -222,11 +245,8 @@ async def reset_password(
         )
     
     user_id = payload.get("sub")
-    result = await db.execute(
-        select(User).where(User.id == user_id)
-    )
-    user = result.scalar_one_or_none()
-    
+    user = await db.get(User, UUID(user_id))
+
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -234,7 +254,10 @@ async def reset_password(
         )
     
     # Update password
-    user.password_hash = AuthService.hash_password(reset_data.new_password)
+    user.password_hash = await asyncio.to_thread(
+        AuthService.hash_password, reset_data.new_password
+    )
     await db.commit()
+    _refresh_user_cache.invalidate(user_id)
     
     return {"message": "Password reset successfully"}
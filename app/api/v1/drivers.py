@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File,
 import boto3
 from app.config import settings
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, tuple_
 from app.database import get_db
 from app.dependencies import get_current_user, get_current_driver
 from app.schemas.driver import (
@@ -12,15 +12,22 @@ from app.schemas.driver import (
 from app.models import User, Driver, TowRequest, TowStatus, Transaction, TransactionType
 from app.services.payment_service import PaymentService
 from app.services.matching_service import MatchingService
-from typing import List
+from app.utils.schema import construct_trusted
+from typing import List, Optional
 from uuid import UUID
+from datetime import datetime, timedelta
 from decimal import Decimal
+import asyncio
 import logging
 
 router = APIRouter(prefix="/drivers", tags=["Drivers"])
 
 logger = logging.getLogger(__name__)
 
+# Earnings windows, built once instead of per request
+_WEEK = timedelta(days=7)
+_MONTH = timedelta(days=30)
+
 @router.get("/available-requests")
 async def get_available_tow_requests(
     db: AsyncSession = Depends(get_db),
@@ -33,36 +40,30 @@ async def get_available_tow_requests(
             detail="Driver profile not found"
         )
     
-    # Get pending offers for this driver
+    # Get pending offers with their tow requests in a single JOIN query
     from app.models import TowRequestOffer, OfferResponse
     result = await db.execute(
-        select(TowRequestOffer)
+        select(TowRequestOffer, TowRequest)
+        .join(TowRequest, TowRequest.id == TowRequestOffer.tow_request_id)
         .where(
             TowRequestOffer.driver_id == current_user.driver_profile.id,
             TowRequestOffer.response == OfferResponse.PENDING
         )
         .order_by(TowRequestOffer.offered_at.desc())
     )
-    offers = result.scalars().all()
-    
-    # Get full tow request details
+
     tow_requests = []
-    for offer in offers:
-        tow_result = await db.execute(
-            select(TowRequest).where(TowRequest.id == offer.tow_request_id)
-        )
-        tow = tow_result.scalar_one_or_none()
-        if tow:
-            tow_requests.append({
-                "tow_request_id": tow.id,
-                "pickup_address": tow.pickup_address,
-                "dropoff_address": tow.dropoff_address,
-                "distance_miles": float(tow.distance_miles),
-                "driver_payout": float(tow.driver_payout),
-                "distance_from_pickup": float(offer.distance_from_pickup),
-                "offered_at": offer.offered_at
-            })
-    
+    for offer, tow in result.all():
+        tow_requests.append({
+            "tow_request_id": tow.id,
+            "pickup_address": tow.pickup_address,
+            "dropoff_address": tow.dropoff_address,
+            "distance_miles": float(tow.distance_miles),
+            "driver_payout": float(tow.driver_payout),
+            "distance_from_pickup": float(offer.distance_from_pickup),
+            "offered_at": offer.offered_at
+        })
+
     return tow_requests
 
 @router.post("/toggle-online")
@@ -130,21 +131,21 @@ async def update_driver_location(
     active_tow = result.scalar_one_or_none()
     
     if active_tow:
-        from app.models import LocationHistory
-        location_record = LocationHistory(
-            tow_request_id=active_tow.id,
-            driver_id=driver.id,
+        # Buffered write — flushed in batches by the background task instead
+        # of committing one history row per 1 Hz location ping
+        from app.services.location_service import location_buffer
+        location_buffer.enqueue({
+            "tow_request_id": active_tow.id,
+            "driver_id": driver.id,
             # CHANGED to use lat/lng columns
-            latitude=location.latitude,
-            longitude=location.longitude,
-            speed=location.speed,
-            heading=location.heading
-        )
-        db.add(location_record)
-        await db.commit()
-        
+            "latitude": location.latitude,
+            "longitude": location.longitude,
+            "speed": location.speed,
+            "heading": location.heading
+        })
+
         # Broadcast location update via WebSocket (handled by WebSocket endpoint)
-    
+
     return {"message": "Location updated successfully"}
 
 @router.post("/apply", status_code=status.HTTP_201_CREATED)
@@ -179,7 +180,6 @@ async def apply_as_driver(
 
     db.add(driver)
     await db.commit()
-    await db.refresh(driver)
 
     # Stripe Connect — non-blocking, log failure but don't crash
     onboarding_url = None
@@ -211,7 +211,7 @@ async def get_driver_profile(
             detail="Driver profile not found"
         )
     
-    return DriverResponse.from_orm(current_user.driver_profile)
+    return construct_trusted(DriverResponse, current_user.driver_profile)
 
 @router.put("/profile", response_model=DriverResponse)
 async def update_driver_profile(
@@ -247,7 +247,7 @@ async def update_driver_profile(
     await db.commit()
     await db.refresh(driver)
     
-    return DriverResponse.from_orm(driver)
+    return construct_trusted(DriverResponse, driver)
 
 @router.post("/{driver_id}/documents")
 async def upload_driver_document(
@@ -396,72 +396,58 @@ async def get_driver_earnings(
         )
     
     driver_id = current_user.driver_profile.id
-    
-    # Total earnings
-    total_result = await db.execute(
-        select(func.sum(Transaction.amount))
-        .where(
-            Transaction.driver_id == driver_id,
-            Transaction.transaction_type == TransactionType.PAYOUT
-        )
-    )
-    total_earnings = total_result.scalar() or Decimal("0")
-    
-    # Completed tows
-    completed_result = await db.execute(
-        select(func.count(TowRequest.id))
-        .where(
-            TowRequest.driver_id == driver_id,
-            TowRequest.status == TowStatus.COMPLETED
-        )
-    )
-    completed_tows = completed_result.scalar() or 0
-    
-    # Average rating
-    rating_result = await db.execute(
-        select(func.avg(TowRequest.driver_rating))
-        .where(
-            TowRequest.driver_id == driver_id,
-            TowRequest.driver_rating.isnot(None)
-        )
-    )
-    average_rating = rating_result.scalar() or Decimal("5.0")
-    
-    # Total distance
-    distance_result = await db.execute(
-        select(func.sum(TowRequest.distance_miles))
-        .where(
-            TowRequest.driver_id == driver_id,
-            TowRequest.status == TowStatus.COMPLETED
+
+    now = datetime.utcnow()
+    week_ago = now - _WEEK
+    month_ago = now - _MONTH
+
+    # All Transaction aggregates in one round-trip using FILTER clauses
+    payout_filter = Transaction.transaction_type == TransactionType.PAYOUT
+    earnings_query = (
+        select(
+            func.sum(Transaction.amount).filter(payout_filter).label("total"),
+            func.sum(Transaction.amount).filter(
+                payout_filter, Transaction.created_at >= week_ago
+            ).label("week"),
+            func.sum(Transaction.amount).filter(
+                payout_filter, Transaction.created_at >= month_ago
+            ).label("month")
         )
+        .where(Transaction.driver_id == driver_id)
     )
-    total_distance = distance_result.scalar() or Decimal("0")
-    
-    # This week earnings
-    from datetime import datetime, timedelta
-    week_ago = datetime.now() - timedelta(days=7)
-    week_result = await db.execute(
-        select(func.sum(Transaction.amount))
-        .where(
-            Transaction.driver_id == driver_id,
-            Transaction.transaction_type == TransactionType.PAYOUT,
-            Transaction.created_at >= week_ago
+
+    # All TowRequest aggregates in a second round-trip
+    completed_filter = TowRequest.status == TowStatus.COMPLETED
+    tows_query = (
+        select(
+            func.count(TowRequest.id).filter(completed_filter).label("completed"),
+            func.avg(TowRequest.driver_rating).label("rating"),
+            func.sum(TowRequest.distance_miles).filter(completed_filter).label("distance")
         )
+        .where(TowRequest.driver_id == driver_id)
     )
-    earnings_this_week = week_result.scalar() or Decimal("0")
-    
-    # This month earnings
-    month_ago = datetime.now() - timedelta(days=30)
-    month_result = await db.execute(
-        select(func.sum(Transaction.amount))
-        .where(
-            Transaction.driver_id == driver_id,
-            Transaction.transaction_type == TransactionType.PAYOUT,
-            Transaction.created_at >= month_ago
-        )
+
+    # The two queries are independent read-only aggregates — run them
+    # concurrently. A single AsyncSession can't execute statements in
+    # parallel, so each helper opens its own session from the pool.
+    from app.database import async_session_maker
+
+    async def _fetch_one_row(query):
+        async with async_session_maker() as session:
+            result = await session.execute(query)
+            return result.one()
+
+    earnings_row, tows_row = await asyncio.gather(
+        _fetch_one_row(earnings_query),
+        _fetch_one_row(tows_query)
     )
-    earnings_this_month = month_result.scalar() or Decimal("0")
-    
+    total_earnings = earnings_row.total or Decimal("0")
+    earnings_this_week = earnings_row.week or Decimal("0")
+    earnings_this_month = earnings_row.month or Decimal("0")
+    completed_tows = tows_row.completed or 0
+    average_rating = tows_row.rating or Decimal("5.0")
+    total_distance = tows_row.distance or Decimal("0")
+
     return DriverEarnings(
         total_earnings=total_earnings,
         completed_tows=completed_tows,
@@ -473,25 +459,72 @@ async def get_driver_earnings(
 
 @router.get("/history")
 async def get_driver_tow_history(
-    skip: int = 0,
+    cursor: Optional[datetime] = None,
+    cursor_id: Optional[UUID] = None,
     limit: int = 20,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_driver)
 ):
-    """Get driver's tow history"""
+    """
+    Get driver's tow history.
+
+    Keyset-paginated: pass the created_at and id of the last row from the
+    previous page as `cursor`/`cursor_id` to fetch the next page. Unlike
+    OFFSET, this stays O(limit) no matter how deep the page is. The id is
+    part of the cursor because created_at alone isn't unique — a strict
+    `<` on it would skip rows sharing the boundary timestamp.
+    """
     if not current_user.driver_profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Driver profile not found"
         )
-    
-    result = await db.execute(
-        select(TowRequest)
+
+    # Project just the columns the client renders — Row tuples skip ORM
+    # hydration entirely — and bound the page size
+    limit = min(limit, 100)
+    query = (
+        select(
+            TowRequest.id,
+            TowRequest.vehicle_year,
+            TowRequest.vehicle_make,
+            TowRequest.vehicle_model,
+            TowRequest.pickup_address,
+            TowRequest.dropoff_address,
+            TowRequest.distance_miles,
+            TowRequest.driver_payout,
+            TowRequest.driver_rating,
+            TowRequest.status,
+            TowRequest.created_at,
+            TowRequest.completed_at
+        )
         .where(TowRequest.driver_id == current_user.driver_profile.id)
-        .order_by(TowRequest.created_at.desc())
-        .offset(skip)
+        .order_by(TowRequest.created_at.desc(), TowRequest.id.desc())
         .limit(limit)
     )
-    tows = result.scalars().all()
-    
-    return tows
+    if cursor is not None:
+        if cursor_id is not None:
+            # Row-value comparison matching the (created_at, id) DESC order
+            query = query.where(
+                tuple_(TowRequest.created_at, TowRequest.id) < tuple_(cursor, cursor_id)
+            )
+        else:
+            # Timestamp-only cursor from an older client
+            query = query.where(TowRequest.created_at < cursor)
+
+    result = await db.execute(query)
+
+    return [{
+        "id": str(row.id),
+        "vehicle_year": row.vehicle_year,
+        "vehicle_make": row.vehicle_make,
+        "vehicle_model": row.vehicle_model,
+        "pickup_address": row.pickup_address,
+        "dropoff_address": row.dropoff_address,
+        "distance_miles": float(row.distance_miles) if row.distance_miles else None,
+        "driver_payout": float(row.driver_payout) if row.driver_payout else None,
+        "driver_rating": row.driver_rating,
+        "status": row.status,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "completed_at": row.completed_at.isoformat() if row.completed_at else None
+    } for row in result.all()]
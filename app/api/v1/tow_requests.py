@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session
-from sqlalchemy import select
-from app.database import get_db
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import bindparam, func, or_, select, update
+from app.database import get_db, async_session_maker
 
 from app.dependencies import get_current_user, get_current_customer, get_current_driver
 from app.schemas.tow_request import (
@@ -17,14 +17,18 @@ from app.services.notification_service import NotificationService
 from app.services.email_service import EmailService
 from app.models import User, TowRequest, TowStatus, PaymentStatus
 from app.utils.geo import calculate_distance
+from app.utils.schema import construct_trusted
 from typing import List
 from uuid import UUID
 
 from pydantic import BaseModel, Field
 from typing import Optional
-from datetime import datetime
+import asyncio
+import logging
 import uuid
 
+logger = logging.getLogger(__name__)
+
 class SimpleTowRequest(BaseModel):
     """Frontend sends simple string data"""
     vehicle_year: int = Field(..., ge=1900, le=2026)
@@ -48,6 +52,36 @@ class SimpleTowRequest(BaseModel):
 
 router = APIRouter(prefix="/tows", tags=["Tow Requests"])
 
+# Status → timestamp column stamped by that transition (EN_ROUTE_PICKUP has none)
+_STATUS_TIMESTAMPS = {
+    TowStatus.ARRIVED_PICKUP: "arrived_pickup_at",
+    TowStatus.VEHICLE_LOADED: "loaded_at",
+    TowStatus.ARRIVED_DROPOFF: "arrived_dropoff_at",
+    TowStatus.COMPLETED: "completed_at",
+}
+
+# Statuses that count as an in-progress tow
+ACTIVE_STATUSES = (
+    TowStatus.ACCEPTED,
+    TowStatus.EN_ROUTE_PICKUP,
+    TowStatus.ARRIVED_PICKUP,
+    TowStatus.VEHICLE_LOADED,
+    TowStatus.EN_ROUTE_DROPOFF,
+    TowStatus.ARRIVED_DROPOFF,
+)
+
+# Statement for the driver active-tow poll, built once at import so each
+# request only binds parameters instead of reconstructing the clause tree
+_ACTIVE_TOW_STMT = (
+    select(TowRequest)
+    .where(
+        TowRequest.driver_id == bindparam("driver_id"),
+        TowRequest.status.in_(ACTIVE_STATUSES)
+    )
+    .order_by(TowRequest.created_at.desc())
+    .limit(1)
+)
+
 @router.post("/quote", response_model=TowQuoteResponse)
 async def get_tow_quote(
     quote_request: TowQuoteRequest,
@@ -90,8 +124,8 @@ async def create_simple_tow_request(
         
         # Step 2: Calculate distance
         distance_miles = calculate_distance(
-            request.pickup_lat, request.pickup_lng,
-            request.dropoff_lat, request.dropoff_lng
+            (request.pickup_lat, request.pickup_lng),
+            (request.dropoff_lat, request.dropoff_lng)
         )
         
         # Step 3: Calculate pricing
@@ -152,7 +186,7 @@ async def create_simple_tow_request(
             # Status
             status=TowStatus.PENDING,
             payment_status=PaymentStatus.PENDING,
-            requested_at=datetime.utcnow(),
+            requested_at=func.now(),
         )
         
         # Step 5: Save to database
@@ -215,31 +249,6 @@ async def create_simple_tow_request(
         raise HTTPException(status_code=500, detail=f"Error creating tow request: {str(e)}")
  
  
-def calculate_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
-    """
-    Calculate distance between two points using Haversine formula.
-    Returns distance in miles.
-    """
-    from math import radians, sin, cos, sqrt, atan2
-    
-    # Earth's radius in miles
-    R = 3959.0
-    
-    # Convert to radians
-    lat1_rad = radians(lat1)
-    lng1_rad = radians(lng1)
-    lat2_rad = radians(lat2)
-    lng2_rad = radians(lng2)
-    
-    # Haversine formula
-    dlat = lat2_rad - lat1_rad
-    dlng = lng2_rad - lng1_rad
-    
-    a = sin(dlat / 2)**2 + cos(lat1_rad) * cos(lat2_rad) * sin(dlng / 2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    
-    distance = R * c
-    return round(distance, 2)
  
  
 def calculate_pricing(
@@ -316,6 +325,7 @@ def calculate_pricing(
 @router.post("/", response_model=TowRequestResponse, status_code=status.HTTP_201_CREATED)
 async def create_tow_request(
     tow_data: TowRequestCreate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_customer)
 ):
@@ -335,16 +345,37 @@ async def create_tow_request(
         tow_reason_id=str(tow_data.tow_reason_id)
     )
     
-    # Create payment intent
+    # Create the Stripe payment intent and pre-fetch candidate drivers
+    # concurrently — the intent is a ~200ms network call and the matching
+    # query doesn't depend on it. The matching query runs on its own
+    # session; AsyncSession isn't safe for concurrent use.
+    async def _find_drivers():
+        async with async_session_maker() as session:
+            return await MatchingService(session).find_available_drivers(
+                pickup_location=(tow_data.pickup_location.latitude, tow_data.pickup_location.longitude),
+                vehicle_type_id=str(tow_data.vehicle_type_id),
+                requires_flatbed=False  # Would get this from tow_reason
+            )
+
+    # Generate the tow id before the row exists so the Stripe idempotency
+    # key and intent metadata reference the real tow — passing None here
+    # gave every intent the same "pi:None" key, which Stripe dedupes
+    # across customers for 24h
+    tow_request_id = uuid.uuid4()
+
     payment_service = PaymentService(db)
-    payment_intent = await payment_service.create_payment_intent(
-        tow_request_id=None,  # Will update after creating tow request
-        customer_id=current_user.id,
-        amount=pricing["customer_price"]
+    payment_intent, drivers = await asyncio.gather(
+        payment_service.create_payment_intent(
+            tow_request_id=tow_request_id,
+            customer_id=current_user.id,
+            amount=pricing["customer_price"]
+        ),
+        _find_drivers()
     )
-    
+
     # Create tow request
     tow_request = TowRequest(
+        id=tow_request_id,
         customer_id=current_user.id,
         service_type_id=tow_data.service_type_id,
         vehicle_type_id=tow_data.vehicle_type_id,
@@ -375,19 +406,45 @@ async def create_tow_request(
     db.add(tow_request)
     await db.commit()
     await db.refresh(tow_request)
-    
-    # Find and notify drivers
-    matching_service = MatchingService(db)
-    drivers = await matching_service.find_available_drivers(
-        pickup_location=(tow_data.pickup_location.latitude, tow_data.pickup_location.longitude),
-        vehicle_type_id=str(tow_data.vehicle_type_id),
-        requires_flatbed=False  # Would get this from tow_reason
-    )
-    
+
+    # Notify drivers after the response — offer fanout (push notifications
+    # per driver) shouldn't hold up the customer's 201. BackgroundTasks
+    # holds a reference until completion (a bare create_task can be
+    # garbage-collected mid-flight); the task gets its own session since
+    # the request session closes with the response.
     if drivers:
-        await matching_service.send_tow_offers(tow_request.id, drivers)
-    
-    return TowRequestResponse.from_orm(tow_request)
+        background_tasks.add_task(_send_tow_offers, tow_request, drivers)
+
+    return construct_trusted(TowRequestResponse, tow_request)
+
+async def _send_tow_offers(tow_request: TowRequest, drivers: list):
+    """Background offer fanout for create_tow_request.
+
+    Takes the in-memory row from the create flow (expire_on_commit=False
+    keeps its attributes loaded) so the fanout never re-SELECTs the tow
+    request just to read the pickup address.
+    """
+    try:
+        async with async_session_maker() as session:
+            await MatchingService(session).send_tow_offers(tow_request, drivers)
+    except Exception as e:
+        logger.error(f"Offer fanout failed for tow {tow_request.id}: {e}")
+
+async def _notify_status_update(user_id, tow_request_id, status_value: str, message: str):
+    """
+    Background status notification. Opens its own session — background
+    tasks run after the request's get_db session has closed.
+    """
+    try:
+        async with async_session_maker() as session:
+            await NotificationService(session).notify_status_update(
+                user_id=user_id,
+                tow_request_id=tow_request_id,
+                status=status_value,
+                message=message
+            )
+    except Exception as e:
+        logger.error(f"Status notification failed for tow {tow_request_id}: {e}")
 
 @router.get("/{tow_id}")
 async def get_tow_request(
@@ -396,18 +453,21 @@ async def get_tow_request(
     current_user: User = Depends(get_current_user)
 ):
     """Get tow request details"""
+    # Authorization folded into the WHERE clause: one statement instead of
+    # fetch-then-check, and "missing" and "not yours" both come back as 404
+    # so tow ids can't be probed for existence.
+    party = [TowRequest.customer_id == current_user.id]
+    if current_user.driver_profile:
+        party.append(TowRequest.driver_id == current_user.driver_profile.id)
+
     result = await db.execute(
-        select(TowRequest).where(TowRequest.id == tow_id)
+        select(TowRequest).where(TowRequest.id == tow_id, or_(*party))
     )
     tow = result.scalar_one_or_none()
-    
+
     if not tow:
         raise HTTPException(404, "Tow request not found")
-    
-    # Check authorization
-    if tow.customer_id != current_user.id:
-        raise HTTPException(403, "Not authorized")
-    
+
     # Return dict instead of Pydantic model to avoid relationship loading issues
     return {
         "id": str(tow.id),
@@ -434,43 +494,57 @@ async def get_tow_request(
 async def update_tow_status(
     tow_id: UUID,
     status_update: TowStatusUpdate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_driver)
 ):
     """Update tow request status (driver only)"""
+    from app.models import Driver
+
+    if not current_user.driver_profile:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to update this tow request"
+        )
+
+    # Single UPDATE ... RETURNING instead of SELECT → mutate → flush: one DB
+    # roundtrip on the hot driver status path, with the assignment check
+    # folded into the WHERE clause.
+    # func.now(): the DB stamps the timestamp, so nothing serializes a
+    # Python datetime and ordering is consistent across app servers
+    values = {"status": status_update.status}
+    ts_column = _STATUS_TIMESTAMPS.get(status_update.status)
+    if ts_column:
+        values[ts_column] = func.now()
+
     result = await db.execute(
-        select(TowRequest).where(TowRequest.id == tow_id)
+        update(TowRequest)
+        .where(
+            TowRequest.id == tow_id,
+            TowRequest.driver_id == current_user.driver_profile.id
+        )
+        .values(**values)
+        .returning(TowRequest)
     )
     tow_request = result.scalar_one_or_none()
-    
+
     if not tow_request:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Tow request not found"
+        # Miss path only: distinguish missing tow (404) from someone else's
+        # tow (403) with a lookup we no longer pay on success.
+        exists = await db.execute(
+            select(TowRequest.id).where(TowRequest.id == tow_id)
         )
-    
-    # Check if driver is assigned to this tow
-    if not current_user.driver_profile or tow_request.driver_id != current_user.driver_profile.id:
+        if exists.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tow request not found"
+            )
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this tow request"
         )
-    
-    # Update status and timestamps
-    from datetime import datetime
-    from app.models import Driver
-    tow_request.status = status_update.status
-    
-    if status_update.status == TowStatus.EN_ROUTE_PICKUP:
-        pass  # No specific timestamp
-    elif status_update.status == TowStatus.ARRIVED_PICKUP:
-        tow_request.arrived_pickup_at = datetime.utcnow()
-    elif status_update.status == TowStatus.VEHICLE_LOADED:
-        tow_request.loaded_at = datetime.utcnow()
-    elif status_update.status == TowStatus.ARRIVED_DROPOFF:
-        tow_request.arrived_dropoff_at = datetime.utcnow()
-    elif status_update.status == TowStatus.COMPLETED:
-        tow_request.completed_at = datetime.utcnow()
+
+    if status_update.status == TowStatus.COMPLETED:
         # Capture payment
         payment_service = PaymentService(db)
         payment_captured = await payment_service.capture_payment(tow_id)
@@ -484,7 +558,9 @@ async def update_tow_status(
                 
                 # Get driver info
                 driver_result = await db.execute(
-                    select(Driver).where(Driver.id == tow_request.driver_id)
+                    select(Driver)
+                    .options(selectinload(Driver.user))
+                    .where(Driver.id == tow_request.driver_id)
                 )
                 driver = driver_result.scalar_one_or_none()
                 
@@ -512,17 +588,19 @@ async def update_tow_status(
                         tow_data=tow_data
                     )
         
-        await db.commit()
-    
-    # Notify customer
-    notification_service = NotificationService(db)
-    await notification_service.notify_status_update(
-        user_id=tow_request.customer_id,
-        tow_request_id=tow_id,
-        status=status_update.status.value,
-        message=f"Your tow status has been updated to: {status_update.status.value}"
+    # Explicit commit for every status — get_db no longer commits on exit
+    await db.commit()
+
+    # Notify customer after the response; push/SMS fanout shouldn't sit on
+    # the driver's critical path
+    background_tasks.add_task(
+        _notify_status_update,
+        tow_request.customer_id,
+        tow_id,
+        status_update.status.value,
+        f"Your tow status has been updated to: {status_update.status.value}"
     )
-    
+
     return {"message": "Status updated successfully"}
 
 @router.get("/{tow_id}/receipt")
@@ -552,7 +630,9 @@ async def get_tow_receipt(
     if tow.driver_id:
         from app.models import Driver
         driver_result = await db.execute(
-            select(Driver).where(Driver.id == tow.driver_id)
+            select(Driver)
+            .options(selectinload(Driver.user))
+            .where(Driver.id == tow.driver_id)
         )
         driver = driver_result.scalar_one_or_none()
         if driver and driver.user:
@@ -580,57 +660,68 @@ async def get_tow_receipt(
 async def cancel_tow_request(
     tow_id: UUID,
     cancellation: TowCancellation,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Cancel a tow request"""
+    # One UPDATE ... RETURNING with ownership and cancellability folded into
+    # the WHERE clause; on success that's the only write-path roundtrip, and
+    # the race between two concurrent cancels resolves in SQL.
     result = await db.execute(
-        select(TowRequest).where(TowRequest.id == tow_id)
+        update(TowRequest)
+        .where(
+            TowRequest.id == tow_id,
+            TowRequest.customer_id == current_user.id,
+            TowRequest.status.not_in([TowStatus.COMPLETED, TowStatus.CANCELLED])
+        )
+        .values(
+            status=TowStatus.CANCELLED,
+            cancelled_at=func.now(),
+            cancellation_reason=cancellation.reason
+        )
+        .returning(TowRequest)
     )
     tow_request = result.scalar_one_or_none()
-    
+
     if not tow_request:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Tow request not found"
-        )
-    
-    # Check authorization
-    if tow_request.customer_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to cancel this tow request"
+        # Miss path only: recover the precise error code
+        check = await db.execute(
+            select(TowRequest.customer_id, TowRequest.status)
+            .where(TowRequest.id == tow_id)
         )
-    
-    # Check if can be cancelled
-    if tow_request.status in [TowStatus.COMPLETED, TowStatus.CANCELLED]:
+        row = check.one_or_none()
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tow request not found"
+            )
+        if row.customer_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to cancel this tow request"
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot cancel completed or already cancelled tow"
         )
-    
-    # Update status
-    from datetime import datetime
-    tow_request.status = TowStatus.CANCELLED
-    tow_request.cancelled_at = datetime.utcnow()
-    tow_request.cancellation_reason = cancellation.reason
-    
+
     # Process refund
     payment_service = PaymentService(db)
     await payment_service.refund_payment(tow_id, cancellation.reason)
     
     await db.commit()
     
-    # Notify driver if assigned
+    # Notify driver if assigned — after the response, off the critical path
     if tow_request.driver_id:
-        notification_service = NotificationService(db)
-        await notification_service.notify_status_update(
-            user_id=tow_request.driver_id,
-            tow_request_id=tow_id,
-            status="cancelled",
-            message="The customer has cancelled the tow request"
+        background_tasks.add_task(
+            _notify_status_update,
+            tow_request.driver_id,
+            tow_id,
+            "cancelled",
+            "The customer has cancelled the tow request"
         )
-    
+
     return {"message": "Tow request cancelled successfully"}
 
 @router.post("/{tow_id}/rate")
@@ -660,29 +751,43 @@ async def rate_tow(
     
     # Determine who is rating
     if tow_request.customer_id == current_user.id:
-        # Customer rating driver
+        # Customer rating driver. Capture any prior rating before
+        # overwriting — re-rating the same tow must replace the old value
+        # in the running sum, not inflate the count.
+        previous_rating = tow_request.driver_rating
         tow_request.driver_rating = rating.rating
         tow_request.driver_review = rating.review
-        
-        # Update driver's overall rating
+
+        # Update driver's overall rating incrementally: one O(1) UPDATE on
+        # the running sum/count instead of re-averaging the driver's whole
+        # tow history on every rating. Committed together with the tow
+        # rating below so the aggregates can't drift from the rows.
         from app.models import Driver
         if tow_request.driver_id:
-            driver_result = await db.execute(
-                select(Driver).where(Driver.id == tow_request.driver_id)
-            )
-            driver = driver_result.scalar_one_or_none()
-            if driver:
-                # Recalculate average rating
-                from sqlalchemy import func
-                avg_result = await db.execute(
-                    select(func.avg(TowRequest.driver_rating)).where(
-                        TowRequest.driver_id == driver.id,
-                        TowRequest.driver_rating.isnot(None)
+            if previous_rating is None:
+                await db.execute(
+                    update(Driver)
+                    .where(Driver.id == tow_request.driver_id)
+                    .values(
+                        rating_sum=Driver.rating_sum + rating.rating,
+                        rating_count=Driver.rating_count + 1,
+                        rating=(Driver.rating_sum + rating.rating) / (Driver.rating_count + 1)
+                    )
+                )
+            else:
+                # Replacement: swap the old value out of the sum, count
+                # unchanged (greatest() guards legacy rows with a rating
+                # but a zero count)
+                delta = rating.rating - float(previous_rating)
+                await db.execute(
+                    update(Driver)
+                    .where(Driver.id == tow_request.driver_id)
+                    .values(
+                        rating_sum=Driver.rating_sum + delta,
+                        rating=(Driver.rating_sum + delta)
+                        / func.greatest(Driver.rating_count, 1)
                     )
                 )
-                avg_rating = avg_result.scalar()
-                if avg_rating:
-                    driver.rating = round(float(avg_rating), 2)
     
     elif current_user.driver_profile and tow_request.driver_id == current_user.driver_profile.id:
         # Driver rating customer
@@ -706,7 +811,39 @@ async def get_customer_tow_history(
 ):
     """Get customer's tow history"""
     print(f"🔍 HISTORY ENDPOINT HIT - User ID: {current_user.id}, Email: {current_user.email}, Role: {current_user.role}")
-    
+
+    # Hot read path: fetch straight from the raw asyncpg pool, skipping ORM
+    # session setup and the per-request commit in get_db. The pool is only
+    # created on Postgres, so fall through to the ORM query otherwise.
+    from app.database import asyncpg_pool
+    if asyncpg_pool is not None:
+        async with asyncpg_pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT id, vehicle_year, vehicle_make, vehicle_model,
+                       pickup_address, dropoff_address, quoted_price,
+                       distance_miles, status, payment_status, created_at
+                FROM tow_requests
+                WHERE customer_id = $1
+                ORDER BY created_at DESC
+                OFFSET $2 LIMIT $3
+                """,
+                current_user.id, skip, limit
+            )
+        return [{
+            "id": str(r["id"]),
+            "vehicle_year": r["vehicle_year"],
+            "vehicle_make": r["vehicle_make"],
+            "vehicle_model": r["vehicle_model"],
+            "pickup_address": r["pickup_address"],
+            "dropoff_address": r["dropoff_address"],
+            "quoted_price": float(r["quoted_price"]) if r["quoted_price"] else None,
+            "distance_miles": float(r["distance_miles"]) if r["distance_miles"] else None,
+            "status": r["status"],
+            "payment_status": r["payment_status"],
+            "created_at": r["created_at"].isoformat()
+        } for r in rows]
+
     result = await db.execute(
         select(TowRequest)
         .where(TowRequest.customer_id == current_user.id)
@@ -726,8 +863,8 @@ async def get_customer_tow_history(
         "vehicle_model": tow.vehicle_model,
         "pickup_address": tow.pickup_address,
         "dropoff_address": tow.dropoff_address,
-        "quoted_price": float(tow.quoted_price),
-        "distance_miles": float(tow.distance_miles),
+        "quoted_price": float(tow.quoted_price) if tow.quoted_price else None,
+        "distance_miles": float(tow.distance_miles) if tow.distance_miles else None,
         "status": tow.status,
         "payment_status": tow.payment_status,
         "created_at": tow.created_at.isoformat()
@@ -746,26 +883,20 @@ async def get_driver_active_tow(
         )
     
     result = await db.execute(
-        select(TowRequest)
-        .where(
-            TowRequest.driver_id == current_user.driver_profile.id,
-            TowRequest.status.in_([
-                TowStatus.ACCEPTED,
-                TowStatus.EN_ROUTE_PICKUP,
-                TowStatus.ARRIVED_PICKUP,
-                TowStatus.VEHICLE_LOADED,
-                TowStatus.EN_ROUTE_DROPOFF,
-                TowStatus.ARRIVED_DROPOFF
-            ])
-        )
-        .order_by(TowRequest.created_at.desc())
+        _ACTIVE_TOW_STMT, {"driver_id": current_user.driver_profile.id}
     )
     tow = result.scalar_one_or_none()
     
     if not tow:
         return None
-    
-    return TowRequestResponse.from_orm(tow)
+
+    # Serialize straight through pydantic-core and hand back finished JSON
+    # bytes — skips FastAPI's jsonable_encoder walk and re-serialization on
+    # this per-poll driver endpoint.
+    return Response(
+        content=construct_trusted(TowRequestResponse, tow).model_dump_json(),
+        media_type="application/json"
+    )
 
 @router.get("/{tow_id}/tracking")
 async def get_tow_tracking(
@@ -793,7 +924,9 @@ async def get_tow_tracking(
     # Get driver's current location
     if tow.driver_id:
         driver_result = await db.execute(
-            select(Driver).where(Driver.id == tow.driver_id)
+            select(Driver)
+            .options(selectinload(Driver.user))
+            .where(Driver.id == tow.driver_id)
         )
         driver = driver_result.scalar_one_or_none()
         
@@ -3,39 +3,180 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.database import get_db
 from app.models import TowRequest, LocationHistory
+from app.services.location_service import location_buffer
 from typing import Dict, List
-import json
+from collections import defaultdict
+import asyncio
+import logging
+import orjson
+import time
 from uuid import UUID
-from datetime import datetime
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 class ConnectionManager:
+    """
+    Tracks this worker's sockets per room and fans broadcasts out through
+    Redis pub/sub. A process-local dict only reaches sockets on the same
+    uvicorn worker — behind multiple workers, updates published from
+    another worker would silently drop. With pub/sub, any worker publishes
+    to the room channel and every worker forwards to its own sockets.
+    """
     def __init__(self):
         self.active_connections: Dict[str, List[WebSocket]] = {}
-    
+        self._listeners: Dict[str, asyncio.Task] = {}
+        self._room_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
     async def connect(self, websocket: WebSocket, room_id: str):
         await websocket.accept()
-        if room_id not in self.active_connections:
-            self.active_connections[room_id] = []
-        self.active_connections[room_id].append(websocket)
-    
+        # Serialize room setup: _start_listener awaits a Redis subscribe, so
+        # two first-connections racing through here could otherwise start two
+        # listener tasks for the same room
+        async with self._room_locks[room_id]:
+            if room_id not in self.active_connections:
+                self.active_connections[room_id] = []
+                await self._start_listener(room_id)
+            self.active_connections[room_id].append(websocket)
+
     def disconnect(self, websocket: WebSocket, room_id: str):
         if room_id in self.active_connections:
             self.active_connections[room_id].remove(websocket)
             if not self.active_connections[room_id]:
                 del self.active_connections[room_id]
-    
-    async def broadcast_to_room(self, room_id: str, message: dict):
-        if room_id in self.active_connections:
-            for connection in self.active_connections[room_id]:
+                listener = self._listeners.pop(room_id, None)
+                if listener:
+                    listener.cancel()
+                # Drop the lock with the room so the dict doesn't grow
+                # unboundedly across tow lifetimes
+                self._room_locks.pop(room_id, None)
+
+    async def _start_listener(self, room_id: str):
+        """Subscribe this worker to the room channel (one task per room)"""
+        from app.database import redis_client
+        if redis_client is None:
+            return
+        try:
+            pubsub = redis_client.pubsub()
+            await pubsub.subscribe(f"ws:{room_id}")
+        except Exception as e:
+            logger.warning(f"Pub/sub subscribe failed for {room_id}: {e}")
+            return
+        self._listeners[room_id] = asyncio.create_task(self._listen(room_id, pubsub))
+
+    async def _listen(self, room_id: str, pubsub):
+        try:
+            async for msg in pubsub.listen():
+                if msg["type"] != "message":
+                    continue
+                payload = msg["data"]
+                if isinstance(payload, str):
+                    payload = payload.encode()
+                await self._deliver_local(room_id, payload)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"Pub/sub listener for {room_id} stopped: {e}")
+        finally:
+            try:
+                await pubsub.unsubscribe(f"ws:{room_id}")
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+    # Cap per-socket send time so one stalled client can't hold up a room
+    SEND_TIMEOUT_SECONDS = 0.5
+
+    async def _deliver_local(self, room_id: str, payload: bytes):
+        """Send a serialized message to the sockets this worker holds for the room"""
+        # Snapshot before awaiting; connect/disconnect may mutate the list
+        connections = list(self.active_connections.get(room_id, []))
+        if not connections:
+            return
+        # Fan out in parallel — sequential awaits let one slow client delay
+        # everyone else in the room (customer phone + dispatch UI)
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(c.send_bytes(payload), self.SEND_TIMEOUT_SECONDS)
+                for c in connections
+            ),
+            return_exceptions=True
+        )
+        # Deferred removal of sockets that errored or timed out
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
                 try:
-                    await connection.send_json(message)
-                except Exception:
-                    pass
+                    self.disconnect(connection, room_id)
+                except ValueError:
+                    pass  # already removed
+
+    async def broadcast_to_room(self, room_id: str, message: dict):
+        from app.database import redis_client
+        # Serialize once with orjson (C implementation, ~3-8x stdlib json)
+        # and send binary frames — send_json would re-encode per socket.
+        payload = orjson.dumps(message)
+        if redis_client is not None:
+            try:
+                await redis_client.publish(f"ws:{room_id}", payload)
+                return
+            except Exception as e:
+                logger.warning(f"Pub/sub publish failed for {room_id}, delivering locally: {e}")
+        # No Redis: fall back to this worker's sockets only
+        await self._deliver_local(room_id, payload)
 
 manager = ConnectionManager()
 
+_PONG = orjson.dumps({"type": "pong"})
+
+async def _receive_message(websocket: WebSocket) -> dict:
+    """
+    Receive a frame and parse it with orjson (~3x stdlib json.loads).
+    Accepts binary or text frames so clients can move to binary without
+    breaking older ones — receive_json() only handles text.
+    """
+    msg = await websocket.receive()
+    if msg["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(msg.get("code") or 1000)
+    raw = msg.get("bytes")
+    if raw is None:
+        raw = msg.get("text", "")
+    return orjson.loads(raw)
+
+# Incoming tracking frame type → broadcast message builder (dict dispatch
+# instead of an elif chain on every frame)
+def _location_update_message(data: dict) -> dict:
+    return {
+        "type": "location_update",
+        "latitude": data["latitude"],
+        "longitude": data["longitude"],
+        "heading": data.get("heading"),
+        "speed": data.get("speed"),
+        "timestamp": int(time.time() * 1000)  # epoch ms; no strftime work
+    }
+
+def _status_update_message(data: dict) -> dict:
+    return {
+        "type": "status_update",
+        "status": data["status"],
+        "message": data.get("message"),
+        "timestamp": int(time.time() * 1000)
+    }
+
+def _eta_update_message(data: dict) -> dict:
+    return {
+        "type": "eta_update",
+        "eta_minutes": data["eta_minutes"],
+        "distance_miles": data.get("distance_miles"),
+        "timestamp": int(time.time() * 1000)
+    }
+
+_TRACKING_HANDLERS = {
+    "location_update": _location_update_message,
+    "status_update": _status_update_message,
+    "eta_update": _eta_update_message,
+}
+
 @router.websocket("/ws/tracking/{tow_id}")
 async def tracking_websocket(websocket: WebSocket, tow_id: str):
     """
@@ -47,47 +188,27 @@ async def tracking_websocket(websocket: WebSocket, tow_id: str):
     
     try:
         while True:
-            # Receive location updates from driver
-            data = await websocket.receive_json()
-            
-            if data.get("type") == "location_update":
+            # Receive location/status/ETA updates from driver
+            data = await _receive_message(websocket)
+            msg_type = data.get("type")
+
+            if msg_type == "location_update":
+                # Persist through the shared buffered writer — one multi-row
+                # INSERT per flush window instead of an INSERT per ping
+                location_buffer.enqueue({
+                    "tow_request_id": UUID(tow_id),
+                    "driver_id": UUID(data["driver_id"]) if data.get("driver_id") else None,
+                    "latitude": data["latitude"],
+                    "longitude": data["longitude"],
+                    "speed": data.get("speed"),
+                    "heading": data.get("heading")
+                })
+
+            build_message = _TRACKING_HANDLERS.get(msg_type)
+            if build_message:
                 # Broadcast to all connected clients
-                await manager.broadcast_to_room(
-                    room_id,
-                    {
-                        "type": "location_update",
-                        "latitude": data["latitude"],
-                        "longitude": data["longitude"],
-                        "heading": data.get("heading"),
-                        "speed": data.get("speed"),
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                )
-            
-            elif data.get("type") == "status_update":
-                # Broadcast status changes
-                await manager.broadcast_to_room(
-                    room_id,
-                    {
-                        "type": "status_update",
-                        "status": data["status"],
-                        "message": data.get("message"),
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                )
-            
-            elif data.get("type") == "eta_update":
-                # Broadcast ETA updates
-                await manager.broadcast_to_room(
-                    room_id,
-                    {
-                        "type": "eta_update",
-                        "eta_minutes": data["eta_minutes"],
-                        "distance_miles": data.get("distance_miles"),
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                )
-    
+                await manager.broadcast_to_room(room_id, build_message(data))
+
     except WebSocketDisconnect:
         manager.disconnect(websocket, room_id)
 
@@ -103,10 +224,10 @@ async def driver_notification_websocket(websocket: WebSocket, driver_id: str):
     try:
         while True:
             # Keep connection alive and receive acknowledgments
-            data = await websocket.receive_json()
-            
+            data = await _receive_message(websocket)
+
             if data.get("type") == "ping":
-                await websocket.send_json({"type": "pong"})
+                await websocket.send_bytes(_PONG)
     
     except WebSocketDisconnect:
         manager.disconnect(websocket, room_id)
@@ -123,10 +244,10 @@ async def customer_notification_websocket(websocket: WebSocket, customer_id: str
     try:
         while True:
             # Keep connection alive
-            data = await websocket.receive_json()
-            
+            data = await _receive_message(websocket)
+
             if data.get("type") == "ping":
-                await websocket.send_json({"type": "pong"})
+                await websocket.send_bytes(_PONG)
     
     except WebSocketDisconnect:
         manager.disconnect(websocket, room_id)
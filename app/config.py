@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 class Settings(BaseSettings):
     # Application
@@ -7,13 +7,23 @@ class Settings(BaseSettings):
     APP_VERSION: str = "1.0.0"
     DEBUG: bool = False
     API_V1_PREFIX: str = "/api/v1"
+    # Worker count when launched via `python -m app.main` (~2*cores+1)
+    UVICORN_WORKERS: int = 4
+    # Serve app/frontend from this process. Set False when a CDN or reverse
+    # proxy handles static assets, so uvicorn workers only do API work
+    SERVE_FRONTEND: bool = True
     
     # Database
     DATABASE_URL: str
-    
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+
+
     # Redis
     REDIS_URL: str
-    
+    REDIS_POOL_SIZE: int = 50
+
+
     # Mapbox
     MAPBOX_PUBLIC_TOKEN: str
     
@@ -52,6 +62,16 @@ class Settings(BaseSettings):
     # Application URLs
     WEB_URL: str = "https://towtruck.com"
     API_URL: str = "https://api.towtruck.com"
+
+    # CORS (comma-separated list of allowed origins)
+    CORS_ORIGINS: str = (
+        "http://localhost:8000,"
+        "https://tow-app-production-38dc.up.railway.app"
+    )
+
+    @property
+    def cors_origins(self) -> List[str]:
+        return [origin.strip() for origin in self.CORS_ORIGINS.split(",") if origin.strip()]
     
     # Business Logic
     PLATFORM_FEE_PERCENTAGE: float = 15.0
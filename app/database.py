@@ -1,8 +1,9 @@
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from sqlalchemy.pool import NullPool
 from app.config import settings
+import asyncio
+import asyncpg
 import redis.asyncio as redis
 from typing import Optional
 
@@ -15,10 +16,50 @@ def normalize_db_url(url: str) -> str:
     return url
 
 # Database engine
+# Tuned pool: bounded size so connection bursts queue instead of piling up on
+# Postgres, pre_ping/recycle so idle-timed-out connections don't surface as 500s.
+# (If deploying behind PgBouncer in transaction mode, switch back to NullPool
+# and let PgBouncer do the multiplexing.)
+_db_url = normalize_db_url(settings.DATABASE_URL)
+_connect_args = {}
+# Pool sizing only applies to the Postgres QueuePool; sqlite dev databases
+# use pools that reject these kwargs at engine construction
+_pool_kwargs = {}
+if _db_url.startswith("postgresql+asyncpg://"):
+    _pool_kwargs = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": 30,
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+    }
+    _connect_args = {
+        # Per-connection cache of prepared statements, so the hot single-row
+        # lookups skip parse+plan on repeat execution (dialect default is 100).
+        # Sized to the compiled-SQL cache below so a statement that compiles
+        # also stays prepared.
+        "prepared_statement_cache_size": 1024,
+        "server_settings": {
+            # JIT compilation only pays off on long analytical queries; for
+            # this app's short OLTP statements it just adds planning overhead
+            "jit": "off",
+            # Tag connections so they're identifiable in pg_stat_activity
+            "application_name": "tow-api",
+            # Aggressive keepalives so connections killed by a load balancer
+            # or NAT timeout are detected instead of hanging a checkout
+            "tcp_keepalives_idle": "30",
+            "tcp_keepalives_interval": "10",
+        }
+    }
+
 engine = create_async_engine(
-    normalize_db_url(settings.DATABASE_URL),
+    _db_url,
     echo=settings.DEBUG,
-    poolclass=NullPool,
+    connect_args=_connect_args,
+    **_pool_kwargs,
+    # Compiled-SQL cache: sized above the default 500 so the full set of hot
+    # statements stays cached alongside admin/reporting queries
+    query_cache_size=1024,
     future=True
 )
 
@@ -32,8 +73,34 @@ async_session_maker = async_sessionmaker(
 # Base class for models
 Base = declarative_base()
 
+# ---- Raw asyncpg pool for hot read endpoints ----
+# Read-only endpoints pay ORM session setup plus a no-op COMMIT per request
+# through get_db; the raw pool lets them fetch Records directly.
+asyncpg_pool: Optional[asyncpg.Pool] = None
+
+async def init_asyncpg_pool() -> None:
+    """Create the raw asyncpg pool (called on startup, Postgres only)."""
+    global asyncpg_pool
+    url = normalize_db_url(settings.DATABASE_URL)
+    if not url.startswith("postgresql+asyncpg://"):
+        # Raw pool only applies to Postgres deployments (dev may run sqlite)
+        return
+    dsn = url.replace("postgresql+asyncpg://", "postgresql://", 1)
+    # min_size prewarms connections so the first requests don't pay setup
+    # cost; statement_cache_size keeps hot queries prepared per connection
+    asyncpg_pool = await asyncpg.create_pool(
+        dsn, min_size=10, max_size=50, statement_cache_size=1024
+    )
+
+async def close_asyncpg_pool() -> None:
+    global asyncpg_pool
+    if asyncpg_pool is not None:
+        await asyncpg_pool.close()
+        asyncpg_pool = None
+
 # ---- Redis (DO NOT CONNECT AT IMPORT TIME) ----
 redis_client: Optional[redis.Redis] = None
+_redis_pool: Optional[redis.ConnectionPool] = None
 
 def normalize_db_url(url: str) -> str:
     url = (url or "").strip()
@@ -53,8 +120,8 @@ def _normalize_redis_url(url: str) -> str:
     return url
 
 async def init_redis() -> None:
-    """Initialize Redis client (called on startup)."""
-    global redis_client
+    """Initialize the pooled Redis client (called on startup)."""
+    global redis_client, _redis_pool
     url = _normalize_redis_url(settings.REDIS_URL)
 
     if not url.startswith(("redis://", "rediss://", "unix://")):
@@ -62,29 +129,46 @@ async def init_redis() -> None:
             f"REDIS_URL must start with redis://, rediss://, or unix://. Got: {url!r}"
         )
 
-    redis_client = redis.from_url(url, decode_responses=True)
+    # Shared connection pool: concurrent callers (auth cache, pub/sub,
+    # offer scheduling) reuse sockets instead of handshaking per call.
+    # With hiredis installed, redis-py picks up its C reply parser.
+    _redis_pool = redis.ConnectionPool.from_url(
+        url,
+        max_connections=settings.REDIS_POOL_SIZE,
+        socket_timeout=2,
+        socket_connect_timeout=1,
+        health_check_interval=30,
+        decode_responses=True,
+    )
+    redis_client = redis.Redis(connection_pool=_redis_pool)
     # Fail fast if creds/host are wrong
     await redis_client.ping()
 
 async def close_redis() -> None:
-    """Close Redis client (called on shutdown)."""
-    global redis_client
+    """Close Redis client and its pool (called on shutdown)."""
+    global redis_client, _redis_pool
     if redis_client is not None:
         await redis_client.aclose()  # aclose() is preferred in recent redis-py
         redis_client = None
+    if _redis_pool is not None:
+        await _redis_pool.disconnect()
+        _redis_pool = None
 
 # ---- Dependencies ----
 async def get_db():
-    """Dependency for getting database sessions"""
+    """
+    Dependency for getting database sessions.
+
+    No commit on the way out — that made every read endpoint pay a COMMIT
+    roundtrip per request. Write handlers (and the services they call)
+    commit explicitly.
+    """
     async with async_session_maker() as session:
         try:
             yield session
-            await session.commit()
         except Exception:
             await session.rollback()
             raise
-        finally:
-            await session.close()
 
 async def get_redis():
     """Dependency for getting Redis client"""
@@ -101,7 +185,24 @@ async def init_db():
         # await conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
         await conn.run_sync(Base.metadata.create_all)
 
+async def warm_connection_pool(count: Optional[int] = None) -> None:
+    """
+    Open pool connections before the app accepts traffic, so the first
+    requests per worker don't each pay the asyncpg handshake (and TLS)
+    latency. The pings run concurrently, holding their connections open at
+    once, which forces the pool to actually establish `count` sockets.
+    """
+    if count is None:
+        count = settings.DB_POOL_SIZE
+
+    async def _ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*[_ping() for _ in range(count)])
+
 async def close_db():
     """Close database connections"""
     await engine.dispose()
+    await close_asyncpg_pool()
     await close_redis()
@@ -1,68 +1,175 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 from app.database import get_db
 from app.services.auth_service import AuthService
-from app.models import User, UserRole
+from app.models import User, Driver, UserRole
 from typing import Optional
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+import enum
+import hashlib
+import logging
+import orjson
+
+logger = logging.getLogger(__name__)
 
 security = HTTPBearer()
 
+# How long a token → user entry stays in Redis. Short enough that role
+# changes and deactivations take effect quickly, long enough to absorb the
+# per-request user SELECT on busy clients.
+AUTH_CACHE_TTL_SECONDS = 60
+
+# Columns that never go into the Redis cache. Nothing past login reads the
+# password hash, and replicating it into a second store only widens the blast
+# radius of a leaked Redis instance. _load_columns leaves absent keys as None.
+_SENSITIVE_COLUMNS = frozenset({"password_hash"})
+
+def _dump_columns(obj) -> dict:
+    """Serialize an ORM instance's column values to JSON-safe primitives"""
+    data = {}
+    for col in obj.__table__.columns:
+        if col.key in _SENSITIVE_COLUMNS:
+            continue
+        value = getattr(obj, col.key)
+        if isinstance(value, (UUID, Decimal)):
+            value = str(value)
+        elif isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        elif isinstance(value, enum.Enum):
+            value = value.value
+        data[col.key] = value
+    return data
+
+def _load_columns(model, data: dict):
+    """Rebuild an ORM instance from _dump_columns output"""
+    obj = model()
+    for col in model.__table__.columns:
+        value = data.get(col.key)
+        if value is not None:
+            python_type = col.type.python_type
+            if python_type is UUID:
+                value = UUID(value)
+            elif python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type is date:
+                value = date.fromisoformat(value)
+            elif python_type is Decimal:
+                value = Decimal(value)
+            elif isinstance(python_type, type) and issubclass(python_type, enum.Enum):
+                value = python_type(value)
+        setattr(obj, col.key, value)
+    return obj
+
+def _cache_key(token: str) -> str:
+    return "auth:" + hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+def _rebuild_user(payload: bytes, db: AsyncSession) -> User:
+    """
+    Rebuild a cached User (+ driver_profile) and attach it to the session
+    without emitting SQL, so attribute writes in endpoints are still
+    tracked and committed normally.
+    """
+    data = orjson.loads(payload)
+    user = _load_columns(User, data["user"])
+    if data["driver"] is not None:
+        user.driver_profile = _load_columns(Driver, data["driver"])
+        make_transient_to_detached(user.driver_profile)
+    else:
+        user.driver_profile = None
+    make_transient_to_detached(user)
+    db.add(user)
+    return user
+
+async def _authenticate(db: AsyncSession, token: str) -> Optional[User]:
+    """
+    Resolve a JWT to a User, consulting the Redis token cache first so the
+    common case skips the per-request DB round-trip.
+    """
+    from app.database import redis_client
+
+    cache_key = None
+    if redis_client is not None:
+        cache_key = _cache_key(token)
+        try:
+            cached = await redis_client.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Auth cache read failed: {e}")
+            cached = None
+        if cached:
+            try:
+                return _rebuild_user(cached, db)
+            except Exception as e:
+                logger.warning(f"Auth cache entry invalid, falling back to DB: {e}")
+
+    user = await AuthService.get_current_user(db, token)
+
+    if user and cache_key is not None:
+        payload = orjson.dumps({
+            "user": _dump_columns(user),
+            "driver": _dump_columns(user.driver_profile) if user.driver_profile else None
+        })
+        try:
+            await redis_client.set(cache_key, payload, ex=AUTH_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"Auth cache write failed: {e}")
+
+    return user
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
 ) -> User:
     """Get current authenticated user from JWT token"""
-    token = credentials.credentials
-    print(f"DEBUG - Token received: {token[:20]}...")  # Print first 20 chars
-    
-    user = await AuthService.get_current_user(db, token)
-    
-    print(f"DEBUG - User found: {user.email if user else 'None'}")
-    print(f"DEBUG - User role: {user.role if user else 'None'}")
-    
+    user = await _authenticate(db, credentials.credentials)
+
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
     return user
 
 
-async def get_current_customer(
-    current_user: User = Depends(get_current_user)
-) -> User:
-    """Ensure current user is a customer"""
-    if current_user.role != UserRole.CUSTOMER:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized. Customer access required."
-        )
-    return current_user
+def require_role(role: UserRole, role_name: str):
+    """
+    Build a single-node dependency that authenticates the token and checks
+    the role in one step. Keeping auth + role guard in one async dependency
+    (instead of chaining Depends(get_current_user)) saves FastAPI a
+    dependency-graph traversal per request, and everything stays on the
+    event loop — nothing falls back to the threadpool.
+    """
+    async def dependency(
+        credentials: HTTPAuthorizationCredentials = Depends(security),
+        db: AsyncSession = Depends(get_db)
+    ) -> User:
+        user = await _authenticate(db, credentials.credentials)
 
-async def get_current_driver(
-    current_user: User = Depends(get_current_user)
-) -> User:
-    """Ensure current user is a driver"""
-    if current_user.role != UserRole.DRIVER:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized. Driver access required."
-        )
-    return current_user
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
 
-async def get_current_admin(
-    current_user: User = Depends(get_current_user)
-) -> User:
-    """Ensure current user is an admin"""
-    if current_user.role != UserRole.ADMIN:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized. Admin access required."
-        )
-    return current_user
+        if user.role != role:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Not authorized. {role_name} access required."
+            )
+
+        return user
+
+    return dependency
+
+get_current_customer = require_role(UserRole.CUSTOMER, "Customer")
+get_current_driver = require_role(UserRole.DRIVER, "Driver")
+get_current_admin = require_role(UserRole.ADMIN, "Admin")
 
 async def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
@@ -71,7 +178,5 @@ async def get_current_user_optional(
     """Get current user if token provided, otherwise None"""
     if not credentials:
         return None
-    
-    token = credentials.credentials
-    user = await AuthService.get_current_user(db, token)
-    return user
+
+    return await _authenticate(db, credentials.credentials)
@@ -1,11 +1,15 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from app.config import settings
-from app.database import init_db, close_db, init_redis
+from app.database import init_db, close_db, init_redis, init_asyncpg_pool, warm_connection_pool
+from app.services.location_service import location_buffer
+from app.services.tow_request_mapper import warm_reference_cache
 from app.api.v1 import auth, drivers, tow_requests, websocket
 from app.api.v1 import config, admin
 import logging
@@ -15,39 +19,61 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    """
+    Single startup/shutdown path. Everything initializes here, exactly
+    once, before the app accepts traffic — no @app.on_event handlers,
+    which would run in addition to lifespan and re-create pools.
+    """
     logger.info("Starting up...")
-    # add temporarily inside lifespan, after init_db()
-    logger.info(f"API prefix: '{settings.API_V1_PREFIX}'")
-    logger.info(f"Drivers routes: {[r.path for r in app.routes if 'driver' in str(r.path)]}")
+    # Size the default executor for CPU-bound work offloaded via asyncio.to_thread
+    # (e.g. password hashing in the auth endpoints)
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 2))
+    )
     await init_db()
+    # Establish pool connections up front; the raw asyncpg pool prewarms
+    # itself via min_size
+    await warm_connection_pool()
+    await init_asyncpg_pool()
     await init_redis()
+    # Lookup-table name → UUID caches for the tow-create mapper
+    await warm_reference_cache()
+    await location_buffer.start()
     yield
     logger.info("Shutting down...")
+    await location_buffer.stop()
     await close_db()
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    lifespan=lifespan  # use ONLY lifespan, not on_event
+    lifespan=lifespan,  # use ONLY lifespan, not on_event
+    default_response_class=ORJSONResponse  # orjson serializes list/dict responses natively
 )
 
+# Origins come from settings (CORS_ORIGINS env var, comma-separated) so new
+# environments don't need code edits. Methods/headers are enumerated —
+# Starlette answers preflights from fixed sets instead of wildcard matching.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "http://localhost:8000",
-        "https://tow-app-production-38dc.up.railway.app",
-    ],
+    allow_origins=settings.cors_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type"],
 )
 
+# Serialized once; the body never changes, so no per-error JSON encoding
+_INTERNAL_ERROR_BODY = b'{"detail":"Internal server error"}'
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    logger.error(f"Global exception: {exc}", exc_info=True)
-    return JSONResponse(
+    # %s placeholder defers formatting until the record is actually emitted
+    logger.error("Global exception: %s", exc, exc_info=True)
+    return Response(
+        content=_INTERNAL_ERROR_BODY,
         status_code=500,
-        content={"detail": "Internal server error"}
+        media_type="application/json"
     )
 
 # ── API routes FIRST ──────────────────────────────────────
@@ -71,15 +97,39 @@ app.include_router(config.router)
 app.include_router(admin.router, prefix=settings.API_V1_PREFIX)
 
 # ── Static files LAST — must come after ALL API routes ────
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles with Cache-Control headers, so browsers don't revalidate
+    every asset against the Python process on each page view. HTML shells
+    always revalidate (they reference the other assets); images and other
+    assets are cached for a day — they aren't content-hashed, so immutable
+    would be wrong.
+    """
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        if response.media_type == "text/html":
+            response.headers["Cache-Control"] = "public, max-age=0, must-revalidate"
+        else:
+            response.headers["Cache-Control"] = "public, max-age=86400"
+        return response
+
+# Gated so deployments with a CDN/reverse proxy in front can turn off
+# in-process static serving (SERVE_FRONTEND=false) and keep every uvicorn
+# worker on API traffic
 frontend_path = os.path.join(os.path.dirname(__file__), "frontend")
-if os.path.exists(frontend_path):
-    app.mount("/", StaticFiles(directory=frontend_path, html=True), name="frontend")
+if settings.SERVE_FRONTEND and os.path.exists(frontend_path):
+    app.mount("/", CachedStaticFiles(directory=frontend_path, html=True), name="frontend")
 
 if __name__ == "__main__":
     import uvicorn
+    # uvloop + httptools: C event loop and HTTP parser instead of the stock
+    # asyncio loop uvicorn falls back to when neither is selected
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=settings.DEBUG
+        loop="uvloop",
+        http="httptools",
+        reload=settings.DEBUG,
+        workers=1 if settings.DEBUG else settings.UVICORN_WORKERS
     )
\ No newline at end of file
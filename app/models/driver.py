@@ -1,10 +1,11 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Numeric, Integer, Text, Date, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Boolean, DateTime, Numeric, Integer, Text, Date, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-import uuid
+from sqlalchemy.schema import FetchedValue
 import enum
 from app.database import Base
+from app.models.types import enum_column
 
 class ApprovalStatus(str, enum.Enum):
     PENDING = "pending"
@@ -19,7 +20,21 @@ class BackgroundCheckStatus(str, enum.Enum):
 
 class Driver(Base):
     __tablename__ = "drivers"
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    __table_args__ = (
+        # Matching only ever scans online, approved drivers with a location;
+        # the partial index keeps that hot set separate from the full roster
+        Index(
+            "idx_drivers_online_approved",
+            "current_latitude", "current_longitude",
+            postgresql_where=text(
+                "is_online = true AND approval_status = 'approved' "
+                "AND current_latitude IS NOT NULL"
+            )
+        ),
+    )
+    # Fetch server defaults via RETURNING on INSERT (no post-commit refresh needed)
+    __mapper_args__ = {"eager_defaults": True}
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), unique=True, nullable=False)
     
     # License information
@@ -53,7 +68,7 @@ class Driver(Base):
     policy_expiry = Column(Date)                          # NEW
     
     # Background check
-    background_check_status = Column(SQLEnum(BackgroundCheckStatus), default=BackgroundCheckStatus.PENDING)
+    background_check_status = Column(enum_column(BackgroundCheckStatus), default=BackgroundCheckStatus.PENDING)
     background_check_date = Column(Date)
     
     # Business details
@@ -66,16 +81,22 @@ class Driver(Base):
     
     # Performance metrics
     rating = Column(Numeric(3, 2), default=5.00)
+    # Running-average inputs so rating updates are O(1) instead of an
+    # AVG() scan over the driver's whole tow history
+    rating_sum = Column(Numeric(10, 2), default=0)
+    rating_count = Column(Integer, default=0)
     total_tows = Column(Integer, default=0)
     
     # Status
     is_online = Column(Boolean, default=False)
     current_latitude = Column(Numeric(10, 8))
     current_longitude = Column(Numeric(11, 8))
-    approval_status = Column(SQLEnum(ApprovalStatus), default=ApprovalStatus.PENDING)
+    approval_status = Column(enum_column(ApprovalStatus), default=ApprovalStatus.PENDING)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # updated_at is maintained by the set_updated_at trigger (see
+    # add_updated_at_trigger.py); FetchedValue marks it server-generated
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue())
     
     # Relationships
     user = relationship("User", back_populates="driver_profile")
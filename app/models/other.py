@@ -1,10 +1,10 @@
-from sqlalchemy import Column, String, Numeric, Integer, ForeignKey, DateTime, Text, Boolean, Enum as SQLEnum, BigInteger, ARRAY
+from sqlalchemy import Column, String, Numeric, Integer, ForeignKey, DateTime, Text, Boolean, BigInteger, ARRAY, Index, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-import uuid
 import enum
 from app.database import Base
+from app.models.types import enum_column
 
 # Tow Request Offers
 class OfferResponse(str, enum.Enum):
@@ -15,12 +15,16 @@ class OfferResponse(str, enum.Enum):
 
 class TowRequestOffer(Base):
     __tablename__ = "tow_request_offers"
+    __table_args__ = (
+        # /drivers/available-requests: pending offers per driver, newest first
+        Index("idx_offers_driver_response_offered", "driver_id", "response", "offered_at"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     tow_request_id = Column(UUID(as_uuid=True), ForeignKey("tow_requests.id", ondelete="CASCADE"))
     driver_id = Column(UUID(as_uuid=True), ForeignKey("drivers.id"))
     offered_at = Column(DateTime(timezone=True), server_default=func.now())
-    response = Column(SQLEnum(OfferResponse), default=OfferResponse.PENDING)
+    response = Column(enum_column(OfferResponse), default=OfferResponse.PENDING)
     responded_at = Column(DateTime(timezone=True))
     rejection_reason = Column(Text)
     distance_from_pickup = Column(Numeric(10, 2))
@@ -32,6 +36,14 @@ class TowRequestOffer(Base):
 # Location History
 class LocationHistory(Base):
     __tablename__ = "location_history"
+    __table_args__ = (
+        # BRIN: rows arrive in recorded_at order, so block ranges stay
+        # correlated and the index is orders of magnitude smaller than a
+        # btree on this append-only table
+        Index("idx_location_history_recorded_brin", "recorded_at", postgresql_using="brin"),
+        # Per-driver traces (breadcrumb playback, audits)
+        Index("idx_location_history_driver_time", "driver_id", "recorded_at"),
+    )
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     tow_request_id = Column(UUID(as_uuid=True), ForeignKey("tow_requests.id", ondelete="CASCADE"))
@@ -59,20 +71,24 @@ class TransactionStatus(str, enum.Enum):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Driver earnings aggregates filter on type and time window
+        Index("idx_transactions_driver_type_created", "driver_id", "transaction_type", "created_at"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     tow_request_id = Column(UUID(as_uuid=True), ForeignKey("tow_requests.id"))
     customer_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     driver_id = Column(UUID(as_uuid=True), ForeignKey("drivers.id"))
     
     amount = Column(Numeric(10, 2), nullable=False)
-    transaction_type = Column(SQLEnum(TransactionType), nullable=False)
+    transaction_type = Column(enum_column(TransactionType), nullable=False)
     
     stripe_charge_id = Column(String(255))
     stripe_transfer_id = Column(String(255))
     stripe_refund_id = Column(String(255))
     
-    status = Column(SQLEnum(TransactionStatus), default=TransactionStatus.PENDING)
+    status = Column(enum_column(TransactionStatus), default=TransactionStatus.PENDING)
     description = Column(Text)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -93,13 +109,13 @@ class TicketPriority(str, enum.Enum):
 class SupportTicket(Base):
     __tablename__ = "support_tickets"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     tow_request_id = Column(UUID(as_uuid=True), ForeignKey("tow_requests.id"))
     subject = Column(String(255), nullable=False)
     description = Column(Text)
-    status = Column(SQLEnum(TicketStatus), default=TicketStatus.OPEN)
-    priority = Column(SQLEnum(TicketPriority), default=TicketPriority.NORMAL)
+    status = Column(enum_column(TicketStatus), default=TicketStatus.OPEN)
+    priority = Column(enum_column(TicketPriority), default=TicketPriority.NORMAL)
     assigned_to = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     resolved_at = Column(DateTime(timezone=True))
@@ -111,7 +127,7 @@ class SupportTicket(Base):
 class SupportMessage(Base):
     __tablename__ = "support_messages"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     ticket_id = Column(UUID(as_uuid=True), ForeignKey("support_tickets.id", ondelete="CASCADE"))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     message = Column(Text, nullable=False)
@@ -131,11 +147,11 @@ class NotificationType(str, enum.Enum):
 class Notification(Base):
     __tablename__ = "notifications"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
     title = Column(String(255), nullable=False)
     body = Column(Text, nullable=False)
-    type = Column(SQLEnum(NotificationType))
+    type = Column(enum_column(NotificationType))
     data = Column(JSONB)
     is_read = Column(Boolean, default=False)
     sent_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -147,7 +163,7 @@ class Notification(Base):
 class PromoCode(Base):
     __tablename__ = "promo_codes"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     code = Column(String(50), unique=True, nullable=False)
     description = Column(Text)
     discount_type = Column(String(20))  # 'percentage', 'fixed'
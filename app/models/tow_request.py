@@ -1,10 +1,11 @@
-from sqlalchemy import Column, String, Numeric, Integer, ForeignKey, DateTime, Text, Enum as SQLEnum, Boolean
+from sqlalchemy import Column, String, Numeric, Integer, ForeignKey, DateTime, Text, Boolean, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-import uuid
+from sqlalchemy.schema import FetchedValue
 import enum
 from app.database import Base
+from app.models.types import enum_column
 
 class TowStatus(str, enum.Enum):
     PENDING = "pending"
@@ -27,8 +28,36 @@ class PaymentStatus(str, enum.Enum):
 
 class TowRequest(Base):
     __tablename__ = "tow_requests"
+    __table_args__ = (
+        # Driver history (keyset pagination orders by created_at DESC)
+        Index("idx_tow_requests_driver_created", "driver_id", "created_at"),
+        # Earnings aggregates and active-tow lookups filter on (driver_id, status)
+        Index("idx_tow_requests_driver_status", "driver_id", "status"),
+        # Customer history
+        Index("idx_tow_requests_customer_created", "customer_id", "created_at"),
+        # Partial index for the /driver/active poll: only in-progress rows,
+        # so the index stays tiny and hot in cache instead of carrying the
+        # driver's entire tow history. (Enum columns store the lowercase
+        # enum values.)
+        Index(
+            "idx_tow_requests_driver_active",
+            "driver_id", "created_at",
+            postgresql_where=text(
+                "status IN ('accepted', 'en_route_pickup', 'arrived_pickup', "
+                "'vehicle_loaded', 'en_route_dropoff', 'arrived_dropoff')"
+            )
+        ),
+        # Status-scoped listings (admin dashboards, reporting)
+        Index("idx_tow_requests_status_requested", "status", "requested_at"),
+        # Dispatcher hot set: undispatched tows only, ordered by age
+        Index(
+            "idx_tow_requests_pending_requested",
+            "requested_at",
+            postgresql_where=text("status IN ('pending', 'searching')")
+        ),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     customer_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     driver_id = Column(UUID(as_uuid=True), ForeignKey("drivers.id"))
     service_type_id = Column(UUID(as_uuid=True), ForeignKey("service_types.id"))
@@ -68,7 +97,7 @@ class TowRequest(Base):
     stripe_fee = Column(Numeric(10, 2))
     
     # Status tracking
-    status = Column(SQLEnum(TowStatus), nullable=False, default=TowStatus.PENDING)
+    status = Column(enum_column(TowStatus), nullable=False, default=TowStatus.PENDING)
     requested_at = Column(DateTime(timezone=True), server_default=func.now())
     accepted_at = Column(DateTime(timezone=True))
     arrived_pickup_at = Column(DateTime(timezone=True))
@@ -80,7 +109,7 @@ class TowRequest(Base):
     
     # Payment
     payment_intent_id = Column(String(255))
-    payment_status = Column(SQLEnum(PaymentStatus), default=PaymentStatus.PENDING)
+    payment_status = Column(enum_column(PaymentStatus), default=PaymentStatus.PENDING)
     
     # Rating
     customer_rating = Column(Integer)
@@ -89,13 +118,19 @@ class TowRequest(Base):
     driver_review = Column(Text)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # updated_at is maintained by the set_updated_at trigger (see
+    # add_updated_at_trigger.py); FetchedValue marks it server-generated
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue())
     
-    # Relationships
-    customer = relationship("User", foreign_keys=[customer_id], back_populates="tow_requests_as_customer")
-    driver = relationship("Driver", foreign_keys=[driver_id], back_populates="tow_requests")
-    service_type = relationship("ServiceType")
-    vehicle_type = relationship("CustomerVehicleType")
-    tow_reason = relationship("TowReason")
-    offers = relationship("TowRequestOffer", back_populates="tow_request")
-    location_history = relationship("LocationHistory", back_populates="tow_request")
+    # Relationships — lazy="raise" turns any implicit lazy load into a hard
+    # error instead of a silent N+1; queries that need a relationship must
+    # say so with selectinload()/joinedload()
+    customer = relationship("User", foreign_keys=[customer_id], back_populates="tow_requests_as_customer", lazy="raise")
+    driver = relationship("Driver", foreign_keys=[driver_id], back_populates="tow_requests", lazy="raise")
+    service_type = relationship("ServiceType", lazy="raise")
+    # Named _ref: "vehicle_type" is taken by the String column above, and a
+    # same-named relationship would shadow it out of the mapping entirely
+    vehicle_type_ref = relationship("CustomerVehicleType", lazy="raise")
+    tow_reason = relationship("TowReason", lazy="raise")
+    offers = relationship("TowRequestOffer", back_populates="tow_request", lazy="raise")
+    location_history = relationship("LocationHistory", back_populates="tow_request", lazy="raise")
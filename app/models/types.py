@@ -0,0 +1,18 @@
+from sqlalchemy import Enum as SQLEnum
+
+def enum_column(enum_cls, length: int = 32) -> SQLEnum:
+    """
+    Column type for status-style Python enums, stored as VARCHAR + CHECK.
+
+    native_enum=False skips Postgres enum types entirely: adding a status
+    needs no lock-heavy ALTER TYPE, and connections skip the enum-OID
+    introspection query at checkout. values_callable stores the lowercase
+    enum *values*, matching the legacy database.sql schema and the raw SQL
+    in the matching service. Reads still come back as enum members.
+    """
+    return SQLEnum(
+        enum_cls,
+        native_enum=False,
+        values_callable=lambda e: [member.value for member in e],
+        length=length,
+    )
@@ -1,11 +1,13 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, String, Boolean, DateTime, text
 from sqlalchemy import and_
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-import uuid
+from sqlalchemy.schema import FetchedValue
+from sqlalchemy.ext.hybrid import hybrid_property
 import enum
 from app.database import Base
+from app.models.types import enum_column
 
 class UserRole(str, enum.Enum):
     CUSTOMER = "customer"
@@ -14,19 +16,24 @@ class UserRole(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    # Fetch server defaults (created_at/updated_at) via RETURNING on INSERT
+    # so callers don't need a refresh round-trip after commit
+    __mapper_args__ = {"eager_defaults": True}
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     email = Column(String(255), unique=True, nullable=False, index=True)
     phone = Column(String(20), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
-    role = Column(SQLEnum(UserRole), nullable=False)
+    role = Column(enum_column(UserRole), nullable=False)
     first_name = Column(String(100))
     last_name = Column(String(100))
     profile_photo_url = Column(String)
     is_verified = Column(Boolean, default=False)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # updated_at is maintained by the set_updated_at trigger (see
+    # add_updated_at_trigger.py); FetchedValue marks it server-generated
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue())
     stripe_customer_id = Column(String(255), nullable=True, index=True)
     default_payment_method_id = Column(String(255), nullable=True)
     
@@ -51,7 +58,12 @@ class User(Base):
         back_populates="user"
     )
     
-    @property
+    @hybrid_property
     def full_name(self):
-        
-        return f"{self.first_name} {self.last_name}".strip()
+        return f"{self.first_name or ''} {self.last_name or ''}".strip()
+
+    @full_name.expression
+    def full_name(cls):
+        # SQL-side form, so name filters run in the database instead of
+        # fetching every row to concatenate in Python
+        return func.trim(func.concat_ws(" ", cls.first_name, cls.last_name))
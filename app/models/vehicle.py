@@ -1,15 +1,19 @@
-from sqlalchemy import Column, String, Boolean, Integer, ForeignKey, ARRAY
+from sqlalchemy import Column, String, Boolean, Integer, ForeignKey, ARRAY, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy import DateTime
-import uuid
 from app.database import Base
 
 class Vehicle(Base):
     __tablename__ = "vehicles"
+    __table_args__ = (
+        # Matching filters on can_tow_types containment (@>); GIN turns that
+        # membership test into an index probe instead of scanning every row
+        Index("ix_vehicles_can_tow_gin", "can_tow_types", postgresql_using="gin"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     driver_id = Column(UUID(as_uuid=True), ForeignKey("drivers.id", ondelete="CASCADE"), nullable=False)
     
     vehicle_type = Column(String(50), nullable=False)  # 'flatbed', 'wheel_lift', 'integrated', 'hook_chain'
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Tuple, List
 from datetime import datetime, date
 from uuid import UUID
@@ -57,8 +57,7 @@ class DriverResponse(BaseModel):
     bank_account_id: Optional[str]
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class DriverLocationUpdate(BaseModel):
     latitude: float = Field(..., ge=-90, le=90)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Tuple
 from datetime import datetime
 from uuid import UUID
@@ -30,7 +30,6 @@ class TowRequestCreate(BaseModel):
     vehicle_year: int = Field(..., ge=1900, le=2026)
     vehicle_make: str = Field(..., min_length=1, max_length=100)
     vehicle_model: str = Field(..., min_length=1, max_length=100)
-    vehicle_type: str  # sedan, suv, luxury, exotic, motorcycle, rv, large_truck
     vehicle_color: Optional[str] = None
     license_plate: Optional[str] = None
     is_awd: bool = False
@@ -54,7 +53,7 @@ class TowRequestResponse(BaseModel):
     vehicle_year: int
     vehicle_make: str
     vehicle_model: str
-    vehicle_type: str
+    vehicle_type: Optional[str] = None
     is_awd: bool
     is_lowered: bool
     is_damaged: bool
@@ -70,8 +69,7 @@ class TowRequestResponse(BaseModel):
     accepted_at: Optional[datetime]
     completed_at: Optional[datetime]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class TowStatusUpdate(BaseModel):
     status: TowStatus
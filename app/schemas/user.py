@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, validator
 from typing import Optional
 from datetime import datetime
 from uuid import UUID
@@ -27,6 +27,8 @@ class UserUpdate(BaseModel):
     profile_photo_url: Optional[str] = None
 
 class UserResponse(UserBase):
+    model_config = ConfigDict(from_attributes=True)
+
     id: UUID
     role: UserRole
     profile_photo_url: Optional[str]
@@ -34,9 +36,6 @@ class UserResponse(UserBase):
     is_active: bool
     created_at: datetime
 
-    class Config:
-        from_attributes = True
-
 class TokenResponse(BaseModel):
     access_token: str
     refresh_token: str
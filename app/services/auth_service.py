@@ -1,65 +1,126 @@
-from datetime import datetime, timedelta
+import asyncio
+import functools
+import time
+from datetime import timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from argon2 import PasswordHasher
+from argon2.exceptions import Argon2Error, InvalidHashError
+import bcrypt
+import jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 from app.config import settings
 from app.models import User
+from app.utils.cache import TTLCache
 from uuid import UUID
 
-pwd_context = CryptContext(
-    schemes=["argon2", "bcrypt"],
-    deprecated="auto",
+# Verified token payloads keyed by the raw token string. Bearer tokens repeat
+# on every request for their whole lifetime, so the HMAC verification and
+# base64 parsing only need to happen once per token per minute.
+_decode_cache = TTLCache(maxsize=10_000, ttl=60)
+
+# The two hottest statements, built once at import so each call binds
+# parameters instead of reconstructing and re-compiling the clause tree.
+# Login only needs id + hash for the password check — the narrow projection
+# keeps failed attempts (the common case under credential stuffing) from
+# materializing a full User row
+_USER_AUTH_STMT = select(User.id, User.password_hash).where(
+    User.email == bindparam("email"), User.is_active.is_(True)
+)
+_USER_BY_ID_STMT = (
+    select(User)
+    # Eager-load driver_profile: every driver endpoint reads it, and a
+    # lazy load here would cost an extra query per request
+    .options(selectinload(User.driver_profile))
+    .where(User.id == bindparam("user_id"), User.is_active.is_(True))
+)
+
+# argon2id tuned for ~10-50ms per hash instead of the heavy library defaults
+password_hasher = PasswordHasher(
+    time_cost=2,
+    memory_cost=19456,  # 19 MiB (OWASP minimum recommendation)
+    parallelism=1,
+)
+
+
+# Key and algorithm pre-bound into partials at import so token calls don't
+# re-read settings or rebuild the algorithm argument per call. PyJWT signs
+# HS256 through OpenSSL's native HMAC rather than pure Python.
+_JWT_ENCODE = functools.partial(
+    jwt.encode, key=settings.SECRET_KEY, algorithm=settings.ALGORITHM
+)
+_JWT_DECODE = functools.partial(
+    jwt.decode, key=settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
 )
 
 class AuthService:
     @staticmethod
     def hash_password(password: str) -> str:
-        return pwd_context.hash(password)
-    
+        return password_hasher.hash(password)
+
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
         """Verify a password against a hash"""
-        return pwd_context.verify(plain_password, hashed_password)
+        if hashed_password.startswith("$argon2"):
+            try:
+                return password_hasher.verify(hashed_password, plain_password)
+            except (Argon2Error, InvalidHashError):
+                return False
+        # Legacy bcrypt hashes, checked via the C extension directly —
+        # no passlib registry import or per-call scheme dispatch
+        try:
+            return bcrypt.checkpw(
+                plain_password.encode("utf-8"), hashed_password.encode("utf-8")
+            )
+        except ValueError:
+            return False
     
     @staticmethod
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
         """Create JWT access token"""
         to_encode = data.copy()
-        
+
+        # exp goes into the token as an integer Unix timestamp anyway — set
+        # it directly instead of allocating datetime/timedelta intermediates
+        # the encoder would only convert back
         if expires_delta:
-            expire = datetime.utcnow() + expires_delta
+            expire = int(time.time() + expires_delta.total_seconds())
         else:
-            expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        
+            expire = int(time.time()) + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
         to_encode.update({"exp": expire, "type": "access"})
-        encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-        return encoded_jwt
-    
+        return _JWT_ENCODE(to_encode)
+
     @staticmethod
     def create_refresh_token(data: dict) -> str:
         """Create JWT refresh token"""
         to_encode = data.copy()
-        expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        expire = int(time.time()) + settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
         to_encode.update({"exp": expire, "type": "refresh"})
-        encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-        return encoded_jwt
+        return _JWT_ENCODE(to_encode)
     
     @staticmethod
     def decode_token(token: str) -> Optional[dict]:
         """Decode and verify JWT token"""
+        payload = _decode_cache.get(token)
+        if payload is not None:
+            # A cache entry can outlive the token itself — re-check exp,
+            # which is all jwt.decode would reject at this point
+            if payload.get("exp", 0) > time.time():
+                return payload
+            _decode_cache.invalidate(token)
+            return None
+
         try:
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]                                 
-            )
-            
-            print(f"🔍 Decode SUCCESS: {payload}")
+            payload = _JWT_DECODE(token)
+
+            _decode_cache.set(token, payload)
             return payload
         except jwt.ExpiredSignatureError:
             print(f"🔍 DECODE FAIL: Token expired")
             return None
-        except jwt.JWTError as e:
+        except jwt.InvalidTokenError as e:
             print(f"🔍 DECODE FAIL: JWT Error: {e}")
             return None
         except Exception as e:
@@ -69,18 +130,21 @@ class AuthService:
     @staticmethod
     async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
         """Authenticate user with email and password"""
-        result = await db.execute(
-            select(User).where(User.email == email, User.is_active == True)
-        )
-        user = result.scalar_one_or_none()
-        
-        if not user:
+        row = (await db.execute(_USER_AUTH_STMT, {"email": email})).first()
+
+        if row is None:
             return None
-        
-        if not AuthService.verify_password(password, user.password_hash):
+
+        # Hash verification is CPU-bound — run it off the event loop
+        if not await asyncio.to_thread(
+            AuthService.verify_password, password, row.password_hash
+        ):
             return None
-        
-        return user
+
+        # Full entity (with driver_profile) only materializes on success —
+        # the login response needs it, rejected attempts never pay for it
+        result = await db.execute(_USER_BY_ID_STMT, {"user_id": row.id})
+        return result.scalar_one_or_none()
 
     @staticmethod
     async def get_current_user(db: AsyncSession, token: str) -> Optional[User]:
@@ -101,11 +165,7 @@ class AuthService:
             print(f"🔍 FAIL: No user_id in payload")
             return None
         
-        result = await db.execute(
-            select(User)
-            .options(selectinload(User.driver_profile))  # <-- only change
-            .where(User.id == UUID(user_id), User.is_active == True)
-        )
+        result = await db.execute(_USER_BY_ID_STMT, {"user_id": UUID(user_id)})
         user = result.scalar_one_or_none()
         print(f"🔍 User from DB: {user.email if user else 'None'}")
         
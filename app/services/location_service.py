@@ -0,0 +1,124 @@
+from decimal import Decimal
+from typing import Dict, List
+from sqlalchemy import insert
+from app.models import LocationHistory
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Flush cadence: small enough that tracking stays near-real-time, large enough
+# that 1 Hz updates from many drivers collapse into one INSERT per window
+FLUSH_INTERVAL_SECONDS = 2.0
+MAX_BATCH_SIZE = 500
+# Bound the queue so a stalled flush can't grow memory without limit
+MAX_QUEUE_SIZE = 10_000
+
+class LocationBuffer:
+    """
+    In-memory buffer for driver location history writes.
+
+    update_driver_location is hit about once per second per active driver;
+    committing one LocationHistory row per call means thousands of tiny
+    commits per second under load. Points are queued here instead and a
+    background task flushes them as a single multi-row INSERT per window.
+    """
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=MAX_QUEUE_SIZE)
+        self._flush_task = None
+
+    def enqueue(self, row: Dict) -> None:
+        """Queue a location_history row dict for the next flush"""
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            # Location pings are disposable; dropping beats unbounded memory
+            logger.warning("Location buffer full; dropping point")
+
+    async def start(self) -> None:
+        """Start the background flush task (called on startup)"""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush remaining points and stop the task (called on shutdown)"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self._flush_all()
+
+    def _drain(self) -> List[Dict]:
+        rows = []
+        while not self._queue.empty() and len(rows) < MAX_BATCH_SIZE:
+            rows.append(self._queue.get_nowait())
+        return rows
+
+    async def _flush_all(self) -> None:
+        # Keep flushing in MAX_BATCH_SIZE chunks until the queue is empty —
+        # one capped drain per window backlogs under sustained load above
+        # MAX_BATCH_SIZE / FLUSH_INTERVAL rows per second, and at shutdown
+        # would discard everything past the first batch
+        while True:
+            rows = self._drain()
+            if not rows:
+                return
+            await self._flush(rows)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+            await self._flush_all()
+
+    async def _flush(self, rows: List[Dict]) -> None:
+        if not rows:
+            return
+
+        # Imported here to avoid a circular import at module load
+        from app.database import asyncpg_pool, async_session_maker
+
+        if asyncpg_pool is not None:
+            # COPY skips per-row INSERT parsing/binding entirely and lands
+            # the whole batch in one commit; id and recorded_at fall back to
+            # their column defaults since they aren't in the column list
+            records = [
+                (
+                    row["tow_request_id"],
+                    row.get("driver_id"),
+                    _numeric(row["latitude"]),
+                    _numeric(row["longitude"]),
+                    _numeric(row.get("speed")),
+                    int(row["heading"]) if row.get("heading") is not None else None,
+                )
+                for row in rows
+            ]
+            try:
+                async with asyncpg_pool.acquire() as conn:
+                    await conn.copy_records_to_table(
+                        "location_history",
+                        records=records,
+                        columns=[
+                            "tow_request_id", "driver_id",
+                            "latitude", "longitude", "speed", "heading",
+                        ],
+                    )
+            except Exception as e:
+                logger.error(f"Error copying {len(rows)} location points: {e}")
+            return
+
+        # ORM fallback when the raw pool isn't available (sqlite dev)
+        try:
+            async with async_session_maker() as session:
+                await session.execute(insert(LocationHistory), rows)
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Error flushing {len(rows)} location points: {e}")
+
+def _numeric(value) -> Decimal:
+    """asyncpg's binary COPY needs Decimal for NUMERIC columns, not float"""
+    return Decimal(str(value)) if value is not None else None
+
+location_buffer = LocationBuffer()
@@ -1,10 +1,18 @@
+from datetime import datetime
 from typing import List, Dict, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text
-from app.models import Driver, Vehicle, User, TowRequestOffer
+from app.models import Driver, Vehicle, User, TowRequest, TowRequestOffer
 from app.config import settings
 from uuid import UUID
 import asyncio
+import orjson
+import time
+
+# How long a quantized-area driver set stays cached. Short: offers sent to a
+# driver who just went offline self-heal via the accept flow, but stale sets
+# shouldn't outlive a couple of ping intervals.
+DRIVER_CACHE_TTL_SECONDS = 5
 
 class MatchingService:
     def __init__(self, db: AsyncSession):
@@ -23,20 +31,42 @@ class MatchingService:
         """
         if max_radius_miles is None:
             max_radius_miles = settings.MAX_DRIVER_SEARCH_RADIUS_MILES
-        
-        # Query to find nearby drivers with geographic search
+
+        # Concurrent requests from the same area produce near-identical
+        # driver sets; memoize per ~100m cell (3-decimal quantization) for a
+        # few seconds so bursts hit Redis instead of re-running the spatial
+        # scan. 1 Hz driver pings bound staleness about as tightly as the TTL.
+        from app.database import redis_client
+        cache_key = None
+        if redis_client is not None:
+            cache_key = (
+                f"drivers:{round(pickup_location[0], 3)}:"
+                f"{round(pickup_location[1], 3)}:{vehicle_type_id}:{max_radius_miles}"
+            )
+            try:
+                cached = await redis_client.get(cache_key)
+            except Exception:
+                cached = None
+            if cached:
+                return orjson.loads(cached)
+
+        # Query to find nearby drivers with geographic search. Distance
+        # pruning happens server-side via ST_DWithin (index-bounded scan);
+        # the KNN operator (<->) in ORDER BY lets the spatial index drive
+        # the nearest-first ordering instead of sorting on the computed
+        # distance column. Points are built with parameterized ST_MakePoint
+        # rather than WKT strings, so the server never lexes point text and
+        # the statement stays plan-cache friendly.
         query = text("""
             SELECT 
                 d.id,
                 d.user_id,
-                u.first_name,
-                u.last_name,
+                TRIM(CONCAT_WS(' ', u.first_name, u.last_name)) AS name,
                 u.phone,
                 d.rating,
                 d.total_tows,
                 v.vehicle_type,
-                v.make,
-                v.model,
+                TRIM(CONCAT_WS(' ', v.make, v.model)) AS vehicle_info,
                 ST_Distance(
                     d.current_location::geography,
                     ST_MakePoint(:lng, :lat)::geography
@@ -48,14 +78,14 @@ class MatchingService:
                 d.is_online = TRUE
                 AND d.approval_status = 'approved'
                 AND d.current_location IS NOT NULL
-                AND :vehicle_type_id = ANY(v.can_tow_types)
+                AND v.can_tow_types @> ARRAY[CAST(:vehicle_type_id AS VARCHAR)]
                 AND ST_DWithin(
                     d.current_location::geography,
                     ST_MakePoint(:lng, :lat)::geography,
                     :max_radius * 1609.34
                 )
-            ORDER BY 
-                distance_miles ASC,
+            ORDER BY
+                d.current_location <-> ST_SetSRID(ST_MakePoint(:lng, :lat), 4326)::geography,
                 d.rating DESC,
                 d.total_tows DESC
             LIMIT 20
@@ -71,57 +101,106 @@ class MatchingService:
             }
         )
         
-        drivers = []
-        for row in result.fetchall():
-            drivers.append({
-                "driver_id": row.id,
-                "user_id": row.user_id,
-                "name": f"{row.first_name} {row.last_name}",
-                "phone": row.phone,
-                "rating": float(row.rating),
-                "total_tows": row.total_tows,
-                "vehicle_type": row.vehicle_type,
-                "vehicle_info": f"{row.make} {row.model}",
-                "distance_miles": float(row.distance_miles)
-            })
-        
+        # Single comprehension over the row mappings: dict-key access on
+        # Row._mapping skips the per-attribute descriptor lookups, and the
+        # comprehension avoids the bound-method .append call per row. The
+        # name/vehicle strings are built NULL-safe in SQL via CONCAT_WS
+        # (same shape as the User.full_name hybrid) — Python concatenation
+        # raised TypeError whenever a nullable part was missing.
+        drivers = [
+            {
+                "driver_id": r["id"],
+                "user_id": r["user_id"],
+                "name": r["name"],
+                "phone": r["phone"],
+                "rating": float(r["rating"]),
+                "total_tows": r["total_tows"],
+                "vehicle_type": r["vehicle_type"],
+                "vehicle_info": r["vehicle_info"],
+                "distance_miles": float(r["distance_miles"])
+            }
+            for r in result.mappings()
+        ]
+
+        if cache_key is not None:
+            try:
+                await redis_client.setex(
+                    cache_key, DRIVER_CACHE_TTL_SECONDS, orjson.dumps(drivers)
+                )
+            except Exception:
+                pass
+
         return drivers
     
     async def send_tow_offers(
         self,
-        tow_request_id: UUID,
+        tow_request: TowRequest,
         drivers: List[Dict],
         batch_size: int = 3
     ) -> None:
         """
         Send tow request offers to drivers in batches
         First batch goes to top 3 drivers simultaneously
+
+        Takes the in-memory TowRequest from the create flow — the pickup
+        address rides along with it, so no follow-up SELECT is needed to
+        fill in the offer text.
         """
-        from app.services.notification_service import NotificationService
-        
-        notification_service = NotificationService(self.db)
-        
+        tow_request_id = tow_request.id
+        # str form computed once for the whole fan-out, not per recipient
+        tid = str(tow_request_id)
+        pickup_address = tow_request.pickup_address
+
         # Send to first batch (top 3 drivers)
         primary_batch = drivers[:batch_size]
-        
-        for driver in primary_batch:
-            # Create offer record
-            offer = TowRequestOffer(
+
+        # One multi-row INSERT for the whole batch instead of an add() and
+        # flush per offer
+        self.db.add_all([
+            TowRequestOffer(
                 tow_request_id=tow_request_id,
                 driver_id=driver["driver_id"],
                 distance_from_pickup=driver["distance_miles"]
             )
-            self.db.add(offer)
-            
-            # Send push notification
-            await notification_service.send_driver_tow_offer(
-                driver_id=driver["driver_id"],
-                tow_request_id=tow_request_id,
-                pickup_address="Pickup location",  # Will be filled from tow_request
-                distance_miles=driver["distance_miles"]
-            )
-        
+            for driver in primary_batch
+        ])
         await self.db.commit()
+
+        # Persist the whole batch's notification rows in one multi-row
+        # INSERT instead of a commit per driver
+        from app.models import NotificationType
+        from app.services.notification_service import NotificationService
+
+        await NotificationService(self.db).send_notifications_bulk([
+            {
+                "user_id": driver["user_id"],
+                "title": "New Tow Request",
+                "body": (
+                    f"New tow request {driver['distance_miles']:.1f} miles "
+                    f"away from you at {pickup_address}"
+                ),
+                "type": NotificationType.TOW_REQUEST,
+                "data": {
+                    "tow_request_id": tid,
+                    "distance_miles": driver["distance_miles"],
+                    "pickup_address": pickup_address
+                },
+            }
+            for driver in primary_batch
+            if driver.get("user_id")
+        ])
+
+        # Fan the push notifications out concurrently — they're independent
+        # network calls, so wall-clock is the slowest one rather than the
+        # sum. Each coroutine gets its own session; AsyncSession can't be
+        # shared across concurrent tasks.
+        await asyncio.gather(
+            *[
+                self._notify_driver_offer(tid, pickup_address, driver)
+                for driver in primary_batch
+            ],
+            return_exceptions=True
+        )
         
         # Schedule backup batch after timeout (handled by background worker)
         if len(drivers) > batch_size:
@@ -131,6 +210,26 @@ class MatchingService:
                 delay_seconds=settings.DRIVER_ACCEPT_TIMEOUT_SECONDS
             )
     
+    @staticmethod
+    async def _notify_driver_offer(
+        tow_request_id: str, pickup_address: str, driver: Dict
+    ) -> None:
+        """Send one driver's offer notification on a dedicated session"""
+        from app.database import async_session_maker
+        from app.services.notification_service import NotificationService
+
+        async with async_session_maker() as session:
+            await NotificationService(session).send_driver_tow_offer(
+                driver_id=driver["driver_id"],
+                tow_request_id=tow_request_id,
+                pickup_address=pickup_address,
+                distance_miles=driver["distance_miles"],
+                # Matching already resolved the user; skip the per-driver lookup
+                user_id=driver.get("user_id"),
+                # Rows were batch-inserted by the caller; only dispatch channels
+                persist=driver.get("user_id") is None
+            )
+
     async def _schedule_backup_offers(
         self,
         tow_request_id: UUID,
@@ -144,15 +243,17 @@ class MatchingService:
         # This is a placeholder - actual implementation would use Celery
         # For now, just store in Redis for worker to pick up
         from app.database import redis_client
-        import json
-        
+
         await redis_client.setex(
             f"backup_offers:{tow_request_id}",
             delay_seconds,
-            json.dumps({
+            orjson.dumps({
                 "tow_request_id": str(tow_request_id),
                 "drivers": remaining_drivers,
-                "scheduled_at": delay_seconds
+                # When the backup batch becomes due, as a Unix timestamp —
+                # this previously stored the delay itself, which no worker
+                # could compare against the clock
+                "fire_at": time.time() + delay_seconds
             })
         )
     
@@ -165,61 +266,58 @@ class MatchingService:
         Accept a tow request and cancel other pending offers
         Returns True if successful, False if already accepted by another driver
         """
-        from app.models import TowRequest, TowStatus
         from app.services.notification_service import NotificationService
-        
-        # Get tow request
+
+        # Conditional UPDATE instead of SELECT-check-mutate: the WHERE on
+        # status is the race check, so two drivers accepting at once resolve
+        # inside Postgres (row lock + re-evaluated predicate) without any
+        # app-level locking. rowcount == 0 means another driver won.
         result = await self.db.execute(
-            select(TowRequest).where(TowRequest.id == tow_request_id)
+            text("""
+                UPDATE tow_requests
+                SET driver_id = :driver_id,
+                    status = 'accepted',
+                    accepted_at = NOW()
+                WHERE id = :tow_request_id
+                  AND status IN ('pending', 'searching')
+                RETURNING customer_id
+            """),
+            {"driver_id": driver_id, "tow_request_id": tow_request_id}
         )
-        tow_request = result.scalar_one_or_none()
-        
-        if not tow_request:
-            return False
-        
-        # Check if already accepted
-        if tow_request.status not in [TowStatus.PENDING, TowStatus.SEARCHING]:
+        row = result.first()
+
+        if row is None:
+            await self.db.rollback()
             return False
-        
-        # Update tow request
-        tow_request.driver_id = driver_id
-        tow_request.status = TowStatus.ACCEPTED
-        tow_request.accepted_at = asyncio.get_event_loop().time()
-        
-        # Update offer status
-        result = await self.db.execute(
-            select(TowRequestOffer).where(
-                TowRequestOffer.tow_request_id == tow_request_id,
-                TowRequestOffer.driver_id == driver_id
-            )
-        )
-        offer = result.scalar_one_or_none()
-        if offer:
-            from app.models.other import OfferResponse
-            offer.response = OfferResponse.ACCEPTED
-            offer.responded_at = asyncio.get_event_loop().time()
-        
-        # Cancel other pending offers
-        other_offers_result = await self.db.execute(
-            select(TowRequestOffer).where(
-                TowRequestOffer.tow_request_id == tow_request_id,
-                TowRequestOffer.driver_id != driver_id
-            )
+
+        customer_id = row.customer_id
+
+        # Flip the whole offer set in one statement: the winner's offer to
+        # accepted, everyone else's to expired. Replaces two SELECTs plus a
+        # Python loop over the other offers.
+        await self.db.execute(
+            text("""
+                UPDATE tow_request_offers
+                SET response = CASE
+                        WHEN driver_id = :driver_id THEN 'accepted'
+                        ELSE 'expired'
+                    END,
+                    responded_at = NOW()
+                WHERE tow_request_id = :tow_request_id
+            """),
+            {"driver_id": driver_id, "tow_request_id": tow_request_id}
         )
-        for other_offer in other_offers_result.scalars():
-            from app.models.other import OfferResponse
-            other_offer.response = OfferResponse.EXPIRED
-        
+
         await self.db.commit()
-        
+
         # Notify customer
         notification_service = NotificationService(self.db)
         await notification_service.notify_customer_driver_assigned(
-            customer_id=tow_request.customer_id,
+            customer_id=customer_id,
             tow_request_id=tow_request_id,
             driver_name="Driver"  # Will be filled with actual driver name
         )
-        
+
         return True
     
     async def reject_tow_request(
@@ -240,6 +338,6 @@ class MatchingService:
         if offer:
             from app.models.other import OfferResponse
             offer.response = OfferResponse.REJECTED
-            offer.responded_at = asyncio.get_event_loop().time()
+            offer.responded_at = datetime.utcnow()
             offer.rejection_reason = reason
             await self.db.commit()
@@ -1,15 +1,50 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.models import Notification, User, NotificationType
+from sqlalchemy import bindparam, insert, select
+from app.models import Driver, Notification, User, NotificationType
 from app.config import settings
 from uuid import UUID
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Union
+import asyncio
 import resend
 import json
 
 # Initialize Resend
 resend.api_key = settings.RESEND_API_KEY
 
+# One Twilio client for the process — constructing it per SMS rebuilt the
+# HTTP session (and its TLS state) every time
+_twilio_client = None
+
+def _get_twilio_client():
+    global _twilio_client
+    if _twilio_client is None:
+        from twilio.rest import Client
+        _twilio_client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+    return _twilio_client
+
+# Hot statements built once at import; call sites bind parameters only
+_USER_BY_ID_STMT = select(User).where(User.id == bindparam("user_id"))
+# Direct join on the driver PK — the earlier .has() form compiled to a
+# correlated EXISTS subquery instead of a straight index lookup
+_DRIVER_USER_STMT = (
+    select(User)
+    .join(Driver, Driver.user_id == User.id)
+    .where(Driver.id == bindparam("driver_id"))
+)
+_NOTIFICATION_BY_ID_STMT = select(Notification).where(
+    Notification.id == bindparam("notification_id")
+)
+
+# Strong references to in-flight channel sends. The event loop only keeps
+# weak refs to tasks, so a bare create_task can be garbage-collected before
+# the send completes.
+_channel_tasks: set = set()
+
+def _spawn(coro) -> None:
+    task = asyncio.create_task(coro)
+    _channel_tasks.add(task)
+    task.add_done_callback(_channel_tasks.discard)
+
 class NotificationService:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -38,30 +73,62 @@ class NotificationService:
         )
         self.db.add(notification)
         await self.db.commit()
-        
-        # Get user details
-        result = await self.db.execute(
-            select(User).where(User.id == user_id)
+
+        await self._dispatch_channels(
+            user_id, title, body, data,
+            send_push=send_push, send_email=send_email, send_sms=send_sms
         )
+
+        return notification
+
+    async def send_notifications_bulk(self, rows: List[Dict]) -> List[UUID]:
+        """
+        Insert many notification rows in a single statement.
+
+        Fan-out paths (tow offers to N drivers) were issuing one INSERT and
+        one COMMIT per recipient; a multi-row INSERT with RETURNING turns N
+        commits (and N WAL fsyncs) into one. Channel sends stay with the
+        caller — this only persists the rows.
+        """
+        if not rows:
+            return []
+
+        stmt = insert(Notification).values(rows).returning(Notification.id)
+        ids = (await self.db.execute(stmt)).scalars().all()
+        await self.db.commit()
+        return list(ids)
+
+    async def _dispatch_channels(
+        self,
+        user_id: UUID,
+        title: str,
+        body: str,
+        data: Optional[Dict] = None,
+        send_push: bool = True,
+        send_email: bool = False,
+        send_sms: bool = False
+    ):
+        """Fire the per-channel sends for a notification that's already stored.
+
+        The sends are fire-and-forget: Twilio/Resend/FCM round-trips have
+        nothing to do with the response, and each helper already catches
+        and reports its own failures.
+        """
+        result = await self.db.execute(_USER_BY_ID_STMT, {"user_id": user_id})
         user = result.scalar_one_or_none()
-        
+
         if not user:
-            return notification
-        
-        # Send push notification
+            return
+
         if send_push:
-            await self._send_push_notification(user, title, body, data)
-        
-        # Send email
+            _spawn(self._send_push_notification(user, title, body, data))
+
         if send_email:
-            await self._send_email(user.email, title, body)
-        
-        # Send SMS
+            _spawn(self._send_email(user.email, title, body))
+
         if send_sms:
-            await self._send_sms(user.phone, body)
-        
-        return notification
-    
+            _spawn(self._send_sms(user.phone, body))
+
     async def _send_push_notification(
         self,
         user: User,
@@ -81,7 +148,9 @@ class NotificationService:
     async def _send_email(self, email: str, subject: str, body: str):
         """Send email via Resend"""
         try:
-            resend.Emails.send({
+            # The Resend SDK is synchronous — keep its network I/O off the
+            # event loop
+            await asyncio.to_thread(resend.Emails.send, {
                 "from": settings.FROM_EMAIL,
                 "to": email,
                 "subject": subject,
@@ -96,10 +165,10 @@ class NotificationService:
             return
         
         try:
-            from twilio.rest import Client
-            client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
-            
-            client.messages.create(
+            client = _get_twilio_client()
+            # Twilio's client is synchronous — run it off the event loop
+            await asyncio.to_thread(
+                client.messages.create,
                 body=message,
                 from_=settings.TWILIO_PHONE_NUMBER,
                 to=phone
@@ -111,45 +180,67 @@ class NotificationService:
     async def send_driver_tow_offer(
         self,
         driver_id: UUID,
-        tow_request_id: UUID,
+        tow_request_id: Union[UUID, str],
         pickup_address: str,
-        distance_miles: float
+        distance_miles: float,
+        user_id: Optional[UUID] = None,
+        persist: bool = True
     ):
-        """Notify driver of new tow request"""
-        result = await self.db.execute(
-            select(User).join(User.driver_profile).where(User.driver_profile.has(id=driver_id))
-        )
-        user = result.scalar_one_or_none()
-        
-        if user:
+        """Notify driver of new tow request.
+
+        Callers that already hold the driver's user_id (matching returns it
+        with every candidate) pass it in and skip the lookup entirely.
+        Batch fan-out persists all rows up front via send_notifications_bulk
+        and passes persist=False so only the channel sends run here.
+        """
+        if user_id is None:
+            result = await self.db.execute(_DRIVER_USER_STMT, {"driver_id": driver_id})
+            user = result.scalar_one_or_none()
+            if not user:
+                return
+            user_id = user.id
+
+        # Normalize once — callers fanning out to many drivers pass the str
+        # they already computed, so no per-recipient UUID.__str__ calls
+        tid = tow_request_id if isinstance(tow_request_id, str) else str(tow_request_id)
+        body = f"New tow request {distance_miles:.1f} miles away from you at {pickup_address}"
+        data = {
+            "tow_request_id": tid,
+            "distance_miles": distance_miles,
+            "pickup_address": pickup_address
+        }
+
+        if persist:
             await self.send_notification(
-                user_id=user.id,
+                user_id=user_id,
                 title="New Tow Request",
-                body=f"New tow request {distance_miles:.1f} miles away from you at {pickup_address}",
+                body=body,
                 notification_type=NotificationType.TOW_REQUEST,
-                data={
-                    "tow_request_id": str(tow_request_id),
-                    "distance_miles": distance_miles,
-                    "pickup_address": pickup_address
-                },
+                data=data,
                 send_push=True,
                 send_sms=True  # Send SMS for time-sensitive requests
             )
+        else:
+            await self._dispatch_channels(
+                user_id, "New Tow Request", body, data,
+                send_push=True, send_sms=True
+            )
     
     async def notify_customer_driver_assigned(
         self,
         customer_id: UUID,
-        tow_request_id: UUID,
+        tow_request_id: Union[UUID, str],
         driver_name: str
     ):
         """Notify customer that a driver has been assigned"""
+        tid = tow_request_id if isinstance(tow_request_id, str) else str(tow_request_id)
         await self.send_notification(
             user_id=customer_id,
             title="Driver Assigned",
             body=f"{driver_name} has accepted your tow request and is on the way!",
             notification_type=NotificationType.TOW_UPDATE,
             data={
-                "tow_request_id": str(tow_request_id),
+                "tow_request_id": tid,
                 "driver_name": driver_name
             },
             send_push=True,
@@ -159,18 +250,19 @@ class NotificationService:
     async def notify_status_update(
         self,
         user_id: UUID,
-        tow_request_id: UUID,
+        tow_request_id: Union[UUID, str],
         status: str,
         message: str
     ):
         """Notify user of tow status update"""
+        tid = tow_request_id if isinstance(tow_request_id, str) else str(tow_request_id)
         await self.send_notification(
             user_id=user_id,
             title=f"Tow Status: {status}",
             body=message,
             notification_type=NotificationType.TOW_UPDATE,
             data={
-                "tow_request_id": str(tow_request_id),
+                "tow_request_id": tid,
                 "status": status
             },
             send_push=True
@@ -179,17 +271,18 @@ class NotificationService:
     async def notify_payment_completed(
         self,
         customer_id: UUID,
-        tow_request_id: UUID,
+        tow_request_id: Union[UUID, str],
         amount: float
     ):
         """Notify customer of successful payment"""
+        tid = tow_request_id if isinstance(tow_request_id, str) else str(tow_request_id)
         await self.send_notification(
             user_id=customer_id,
             title="Payment Completed",
             body=f"Your payment of ${amount:.2f} has been processed. Thank you for using our service!",
             notification_type=NotificationType.PAYMENT,
             data={
-                "tow_request_id": str(tow_request_id),
+                "tow_request_id": tid,
                 "amount": amount
             },
             send_push=True,
@@ -199,13 +292,12 @@ class NotificationService:
     async def notify_driver_earnings(
         self,
         driver_id: UUID,
-        tow_request_id: UUID,
+        tow_request_id: Union[UUID, str],
         amount: float
     ):
         """Notify driver of earnings from completed tow"""
-        result = await self.db.execute(
-            select(User).join(User.driver_profile).where(User.driver_profile.has(id=driver_id))
-        )
+        tid = tow_request_id if isinstance(tow_request_id, str) else str(tow_request_id)
+        result = await self.db.execute(_DRIVER_USER_STMT, {"driver_id": driver_id})
         user = result.scalar_one_or_none()
         
         if user:
@@ -215,7 +307,7 @@ class NotificationService:
                 body=f"You've earned ${amount:.2f} from your completed tow!",
                 notification_type=NotificationType.PAYMENT,
                 data={
-                    "tow_request_id": str(tow_request_id),
+                    "tow_request_id": tid,
                     "amount": amount
                 },
                 send_push=True
@@ -223,9 +315,7 @@ class NotificationService:
     
     async def send_welcome_email(self, user_id: UUID):
         """Send welcome email to new user"""
-        result = await self.db.execute(
-            select(User).where(User.id == user_id)
-        )
+        result = await self.db.execute(_USER_BY_ID_STMT, {"user_id": user_id})
         user = result.scalar_one_or_none()
         
         if user:
@@ -244,7 +334,7 @@ class NotificationService:
     async def mark_notification_read(self, notification_id: UUID) -> bool:
         """Mark notification as read"""
         result = await self.db.execute(
-            select(Notification).where(Notification.id == notification_id)
+            _NOTIFICATION_BY_ID_STMT, {"notification_id": notification_id}
         )
         notification = result.scalar_one_or_none()
         
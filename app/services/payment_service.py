@@ -1,3 +1,4 @@
+import asyncio
 import stripe
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -9,6 +10,10 @@ from typing import Dict
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
+# Stripe customer ids barely change; a day in Redis keeps the hot payment
+# path from touching the users table at all
+STRIPE_CUSTOMER_CACHE_TTL_SECONDS = 86400
+
 class PaymentService:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -26,8 +31,11 @@ class PaymentService:
         # Get or create Stripe customer
         stripe_customer = await self._get_or_create_stripe_customer(customer_id)
         
-        # Create payment intent (authorized but not captured yet)
-        intent = stripe.PaymentIntent.create(
+        # Create payment intent (authorized but not captured yet). The
+        # Stripe SDK is synchronous — every call runs via to_thread so the
+        # HTTP round-trip never blocks the event loop.
+        intent = await asyncio.to_thread(
+            stripe.PaymentIntent.create,
             amount=int(amount * 100),  # Convert to cents
             currency="usd",
             customer=stripe_customer,
@@ -36,7 +44,10 @@ class PaymentService:
                 "tow_request_id": str(tow_request_id),
                 "customer_id": str(customer_id)
             },
-            description=f"Tow service request {tow_request_id}"
+            description=f"Tow service request {tow_request_id}",
+            # Deterministic per tow: a retry after a network blip returns
+            # the original PaymentIntent instead of authorizing twice
+            idempotency_key=f"pi:{tow_request_id}"
         )
         
         # Update tow request with payment intent
@@ -73,7 +84,11 @@ class PaymentService:
         
         try:
             # Capture the payment
-            intent = stripe.PaymentIntent.capture(tow_request.payment_intent_id)
+            intent = await asyncio.to_thread(
+                stripe.PaymentIntent.capture,
+                tow_request.payment_intent_id,
+                idempotency_key=f"capture:{tow_request_id}"
+            )
             
             # Update status
             from app.models.tow_request import PaymentStatus
@@ -126,7 +141,8 @@ class PaymentService:
         
         try:
             # Create transfer to driver's connected account
-            transfer = stripe.Transfer.create(
+            transfer = await asyncio.to_thread(
+                stripe.Transfer.create,
                 amount=int(tow_request.driver_payout * 100),  # in cents
                 currency="usd",
                 destination=driver.bank_account_id,
@@ -134,7 +150,8 @@ class PaymentService:
                     "tow_request_id": str(tow_request_id),
                     "driver_id": str(driver.id)
                 },
-                description=f"Payout for tow {tow_request_id}"
+                description=f"Payout for tow {tow_request_id}",
+                idempotency_key=f"transfer:{tow_request_id}"
             )
             
             # Record transaction
@@ -183,13 +200,15 @@ class PaymentService:
         
         try:
             # Create refund
-            refund = stripe.Refund.create(
+            refund = await asyncio.to_thread(
+                stripe.Refund.create,
                 payment_intent=tow_request.payment_intent_id,
                 reason="requested_by_customer",
                 metadata={
                     "tow_request_id": str(tow_request_id),
                     "reason": reason or "Cancelled"
-                }
+                },
+                idempotency_key=f"refund:{tow_request_id}"
             )
             
             # Update payment status
@@ -221,7 +240,8 @@ class PaymentService:
         Returns onboarding URL
         """
         # Create Express account
-        account = stripe.Account.create(
+        account = await asyncio.to_thread(
+            stripe.Account.create,
             type="express",
             email=email,
             capabilities={
@@ -230,11 +250,13 @@ class PaymentService:
             business_type="individual",
             metadata={
                 "driver_id": str(driver_id)
-            }
+            },
+            idempotency_key=f"connect:{driver_id}"
         )
         
         # Generate onboarding link
-        account_link = stripe.AccountLink.create(
+        account_link = await asyncio.to_thread(
+            stripe.AccountLink.create,
             account=account.id,
             refresh_url=f"{settings.WEB_URL}/driver/onboarding",
             return_url=f"{settings.WEB_URL}/driver/dashboard",
@@ -254,24 +276,54 @@ class PaymentService:
         return account_link.url
     
     async def _get_or_create_stripe_customer(self, user_id: UUID) -> str:
-        """Get existing Stripe customer ID or create new one"""
+        """Get existing Stripe customer ID or create new one.
+
+        Previously created a brand-new Stripe customer on every payment —
+        a 150-400ms blocking round-trip per call and an ever-growing pile
+        of duplicate customers on Stripe's side. Resolution order is now
+        Redis -> users.stripe_customer_id -> Customer.create (persisted
+        and cached for next time).
+        """
+        from app.database import redis_client
+
+        cache_key = f"stripe_customer:{user_id}"
+        if redis_client is not None:
+            try:
+                cached = await redis_client.get(cache_key)
+            except Exception:
+                cached = None
+            if cached:
+                return cached
+
         result = await self.db.execute(
             select(User).where(User.id == user_id)
         )
         user = result.scalar_one_or_none()
-        
+
         if not user:
             raise ValueError("User not found")
-        
-        # Check if user already has Stripe customer ID (would need to add field to User model)
-        # For now, create new customer each time (in production, cache this)
-        customer = stripe.Customer.create(
-            email=user.email,
-            name=user.full_name,
-            phone=user.phone,
-            metadata={
-                "user_id": str(user_id)
-            }
-        )
-        
-        return customer.id
+
+        if not user.stripe_customer_id:
+            customer = await asyncio.to_thread(
+                stripe.Customer.create,
+                email=user.email,
+                name=user.full_name,
+                phone=user.phone,
+                metadata={
+                    "user_id": str(user_id)
+                }
+            )
+            user.stripe_customer_id = customer.id
+            await self.db.commit()
+
+        if redis_client is not None:
+            try:
+                await redis_client.setex(
+                    cache_key,
+                    STRIPE_CUSTOMER_CACHE_TTL_SECONDS,
+                    user.stripe_customer_id
+                )
+            except Exception:
+                pass
+
+        return user.stripe_customer_id
@@ -1,15 +1,81 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict
+from typing import Dict, NamedTuple, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.config import settings
 from app.models import ServiceType, CustomerVehicleType, TowReason
+from app.utils.cache import TTLCache
+
+# Reference rows by id. These tables hold a handful of rows that change only
+# through admin edits, yet every quote resolved all three with a SELECT each.
+# Five minutes of staleness on a price table is acceptable.
+_reference_cache = TTLCache(maxsize=256, ttl=300)
+
+# Pre-cast pricing factors per (service, vehicle, reason) triple, so the hot
+# quote path is one dict lookup and float math — no ORM attribute access,
+# Numeric-to-float casts, or settings fallbacks per request
+_factors_cache = TTLCache(maxsize=512, ttl=300)
+
+class _PricingFactors(NamedTuple):
+    base_price: float
+    per_mile_rate: float
+    included_miles: float
+    vehicle_multiplier: float
+    reason_fee: float
+
+_CENT = Decimal("0.01")
+
+def _cents(value: float) -> Decimal:
+    """Round a float to cents — skips the Decimal(str(...)) round-trip"""
+    return Decimal(value).quantize(_CENT)
 
 class PricingService:
     def __init__(self, db: AsyncSession):
         self.db = db
-    
+
+    async def _get_reference(self, model, row_id):
+        """Fetch a reference-table row by id through the shared TTL cache.
+
+        A miss loads the whole table — these hold a handful of rows each,
+        so one SELECT warms every id at once and a cold quote costs at most
+        three round-trips per TTL window instead of three per request.
+        """
+        key = (model.__tablename__, str(row_id))
+        row = _reference_cache.get(key)
+        if row is None:
+            result = await self.db.execute(select(model))
+            for loaded in result.scalars():
+                # Detach so the cached rows outlive this request's session
+                self.db.expunge(loaded)
+                _reference_cache.set((model.__tablename__, str(loaded.id)), loaded)
+            row = _reference_cache.get(key)
+        return row
+
+    async def _get_pricing_factors(
+        self, service_type_id, vehicle_type_id, tow_reason_id
+    ) -> Optional[_PricingFactors]:
+        """Resolve one pre-cast factor tuple for the quote's catalog triple"""
+        key = (str(service_type_id), str(vehicle_type_id), str(tow_reason_id))
+        factors = _factors_cache.get(key)
+        if factors is None:
+            service = await self._get_reference(ServiceType, service_type_id)
+            vehicle_type = await self._get_reference(CustomerVehicleType, vehicle_type_id)
+            tow_reason = await self._get_reference(TowReason, tow_reason_id)
+
+            if not service or not vehicle_type or not tow_reason:
+                return None
+
+            factors = _PricingFactors(
+                base_price=float(service.base_price or settings.DEFAULT_BASE_PRICE),
+                per_mile_rate=float(service.per_mile_rate or settings.DEFAULT_PER_MILE_RATE),
+                included_miles=float(service.included_miles or settings.DEFAULT_INCLUDED_MILES),
+                vehicle_multiplier=float(vehicle_type.price_multiplier),
+                reason_fee=float(tow_reason.price_adjustment),
+            )
+            _factors_cache.set(key, factors)
+        return factors
+
     async def calculate_tow_price(
         self,
         distance_miles: float,
@@ -26,43 +92,28 @@ class PricingService:
         if time_of_day is None:
             time_of_day = datetime.now()
         
-        # Get service type
-        service_result = await self.db.execute(
-            select(ServiceType).where(ServiceType.id == service_type_id)
-        )
-        service = service_result.scalar_one_or_none()
-        
-        # Get vehicle type
-        vehicle_result = await self.db.execute(
-            select(CustomerVehicleType).where(CustomerVehicleType.id == vehicle_type_id)
-        )
-        vehicle_type = vehicle_result.scalar_one_or_none()
-        
-        # Get tow reason
-        reason_result = await self.db.execute(
-            select(TowReason).where(TowReason.id == tow_reason_id)
+        # One cached tuple of pre-cast floats per catalog triple; a warm
+        # quote does no DB work and no ORM attribute access
+        factors = await self._get_pricing_factors(
+            service_type_id, vehicle_type_id, tow_reason_id
         )
-        tow_reason = reason_result.scalar_one_or_none()
-        
-        if not service or not vehicle_type or not tow_reason:
+
+        if factors is None:
             raise ValueError("Invalid service, vehicle type, or tow reason")
-        
-        # Calculate base price
-        base_price = float(service.base_price or settings.DEFAULT_BASE_PRICE)
-        per_mile_rate = float(service.per_mile_rate or settings.DEFAULT_PER_MILE_RATE)
-        included_miles = service.included_miles or settings.DEFAULT_INCLUDED_MILES
-        
+
+        base_price = factors.base_price
+        per_mile_rate = factors.per_mile_rate
+
         # Add mileage beyond included miles
-        extra_miles = max(0, distance_miles - included_miles)
+        extra_miles = max(0, distance_miles - factors.included_miles)
         mileage_fee = extra_miles * per_mile_rate
-        
+
         # Apply vehicle type multiplier
-        vehicle_multiplier = float(vehicle_type.price_multiplier)
-        vehicle_adjustment = base_price * (vehicle_multiplier - 1)
-        
+        vehicle_adjustment = base_price * (factors.vehicle_multiplier - 1)
+
         # Add reason-specific fees
-        reason_fee = float(tow_reason.price_adjustment)
-        
+        reason_fee = factors.reason_fee
+
         # Time-based pricing (night/weekend surcharge)
         time_multiplier = self._get_time_multiplier(time_of_day)
         
@@ -89,12 +140,12 @@ class PricingService:
         net_platform_revenue = platform_fee - stripe_fee
         
         return {
-            "customer_price": round(Decimal(str(customer_price)), 2),
-            "driver_payout": round(Decimal(str(driver_payout)), 2),
-            "platform_fee": round(Decimal(str(platform_fee)), 2),
-            "stripe_fee": round(Decimal(str(stripe_fee)), 2),
-            "net_revenue": round(Decimal(str(net_platform_revenue)), 2),
-            "distance_miles": round(Decimal(str(distance_miles)), 2),
+            "customer_price": _cents(customer_price),
+            "driver_payout": _cents(driver_payout),
+            "platform_fee": _cents(platform_fee),
+            "stripe_fee": _cents(stripe_fee),
+            "net_revenue": _cents(net_platform_revenue),
+            "distance_miles": _cents(distance_miles),
             "estimated_duration_minutes": int(distance_miles * 2.5),  # ~24mph average
             "breakdown": {
                 "base": base_price,
@@ -10,6 +10,34 @@ from typing import Dict, Any
 import uuid
 
 
+# name → UUID caches for the three lookup tables, warmed once at startup.
+# These tables are tiny and effectively static, so the mapper resolves
+# names from these dicts instead of one SELECT per name per tow create.
+_vehicle_type_ids: Dict[str, uuid.UUID] = {}
+_tow_reason_ids: Dict[str, uuid.UUID] = {}
+_service_type_ids: Dict[str, uuid.UUID] = {}
+
+
+async def warm_reference_cache() -> None:
+    """Load the lookup tables into the name → UUID caches (run in lifespan).
+
+    Safe to call again to pick up admin edits; the mapper falls back to a
+    SELECT for any name not in the cache, so a stale or empty cache only
+    costs the old per-create query, never a wrong answer.
+    """
+    from app.database import async_session_maker
+    from app.models import CustomerVehicleType, ServiceType, TowReason
+
+    async with async_session_maker() as session:
+        for model, cache in (
+            (CustomerVehicleType, _vehicle_type_ids),
+            (TowReason, _tow_reason_ids),
+            (ServiceType, _service_type_ids),
+        ):
+            result = await session.execute(select(model.name, model.id))
+            cache.update({name: row_id for name, row_id in result})
+
+
 class TowRequestMapper:
     """Maps simple frontend tow request data to database UUID format"""
     
@@ -89,7 +117,12 @@ class TowRequestMapper:
         # Normalize the vehicle type string
         normalized = vehicle_type.lower().strip()
         db_value = self.VEHICLE_TYPE_MAP.get(normalized, "sedan")
-        
+
+        # Warm cache hit — no query
+        cached = _vehicle_type_ids.get(db_value)
+        if cached is not None:
+            return cached
+
         # Query the database for the UUID using async select
         result = await self.db.execute(
             select(CustomerVehicleType).filter(
@@ -100,7 +133,8 @@ class TowRequestMapper:
         
         if not vehicle_type_obj:
             raise ValueError(f"Vehicle type '{vehicle_type}' not found in database")
-        
+
+        _vehicle_type_ids[db_value] = vehicle_type_obj.id
         return vehicle_type_obj.id
     
     async def _get_tow_reason_id(self, reason: str) -> uuid.UUID:
@@ -110,7 +144,12 @@ class TowRequestMapper:
         # Normalize the reason string
         normalized = reason.lower().strip()
         db_value = self.REASON_MAP.get(normalized, "other")
-        
+
+        # Warm cache hit — no query
+        cached = _tow_reason_ids.get(db_value)
+        if cached is not None:
+            return cached
+
         # Query the database for the UUID using async select
         result = await self.db.execute(
             select(TowReason).filter(
@@ -121,7 +160,8 @@ class TowRequestMapper:
         
         if not reason_obj:
             raise ValueError(f"Tow reason '{reason}' not found in database")
-        
+
+        _tow_reason_ids[db_value] = reason_obj.id
         return reason_obj.id
     
     async def _determine_service_type(self, request_data: Dict[str, Any]) -> uuid.UUID:
@@ -153,7 +193,12 @@ class TowRequestMapper:
             service_name = "flatbed_tow"
         else:
             service_name = "standard_tow"
-        
+
+        # Warm cache hit — no query
+        cached = _service_type_ids.get(service_name)
+        if cached is not None:
+            return cached
+
         # Query the database for the UUID using async select
         result = await self.db.execute(
             select(ServiceType).filter(
@@ -164,5 +209,6 @@ class TowRequestMapper:
         
         if not service_obj:
             raise ValueError(f"Service type '{service_name}' not found in database")
-        
+
+        _service_type_ids[service_name] = service_obj.id
         return service_obj.id
\ No newline at end of file
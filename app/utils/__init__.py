@@ -1,5 +1,8 @@
+from app.utils.cache import TTLCache
+from app.utils.schema import construct_trusted
 from app.utils.geo import (
     calculate_distance,
+    calculate_distance_batch,
     calculate_eta,
     format_point_for_db,
     parse_point_from_db,
@@ -8,7 +11,10 @@ from app.utils.geo import (
 )
 
 __all__ = [
+    "TTLCache",
+    "construct_trusted",
     "calculate_distance",
+    "calculate_distance_batch",
     "calculate_eta",
     "format_point_for_db",
     "parse_point_from_db",
@@ -1,6 +1,9 @@
 from math import radians, cos, sin, asin, sqrt
 from typing import Tuple
 
+import numpy as np
+from sqlalchemy import func
+
 def calculate_distance(point1: Tuple[float, float], point2: Tuple[float, float]) -> float:
     """
     Calculate distance between two geographic points using Haversine formula
@@ -27,6 +30,38 @@ def calculate_distance(point1: Tuple[float, float], point2: Tuple[float, float])
     
     return c * r
 
+def calculate_distance_batch(
+    origin: Tuple[float, float], points: "np.ndarray"
+) -> "np.ndarray":
+    """
+    Vectorized Haversine from one origin to many points
+    Returns distances in miles as a float64 array
+
+    One NumPy pass replaces a per-point Python loop over
+    calculate_distance — use this wherever distances to a whole candidate
+    list are needed. For a single pair, calculate_distance is faster
+    (no array setup overhead).
+
+    Args:
+        origin: (latitude, longitude)
+        points: (N, 2) array-like of [latitude, longitude] rows
+    """
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+
+    lat1 = radians(origin[0])
+    lon1 = radians(origin[1])
+    lat2 = np.radians(pts[:, 0])
+    lon2 = np.radians(pts[:, 1])
+
+    # Haversine formula, elementwise over the whole array
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+
+    # Radius of earth in miles
+    return 3956 * 2 * np.arcsin(np.sqrt(a))
+
 def calculate_eta(distance_miles: float, average_speed_mph: float = 35) -> int:
     """
     Calculate estimated time of arrival in minutes
@@ -46,12 +81,20 @@ def calculate_eta(distance_miles: float, average_speed_mph: float = 35) -> int:
     
     return max(1, minutes)  # Minimum 1 minute
 
-def format_point_for_db(lat: float, lng: float) -> str:
+def format_point_for_db(lat: float, lng: float):
     """
-    Format geographic point for database insertion
-    Returns WKT (Well-Known Text) format
+    Build a typed PostGIS point expression for database insertion
+
+    Returns ST_SetSRID(ST_MakePoint(lng, lat), 4326) as a SQLAlchemy
+    expression, so the coordinates travel as two float bind params instead
+    of a WKT string the server has to lex through ST_GeomFromText. The
+    matching query builds its points the same way inline.
+
+    Note: only needed for the PostGIS geometry path (e.g. drivers.current_location
+    in raw SQL). The driver/tow location endpoints write plain numeric lat/lng
+    columns.
     """
-    return f"POINT({lng} {lat})"
+    return func.ST_SetSRID(func.ST_MakePoint(lng, lat), 4326)
 
 def parse_point_from_db(point_str: str) -> Tuple[float, float]:
     """
@@ -59,10 +102,12 @@ def parse_point_from_db(point_str: str) -> Tuple[float, float]:
     Expects format: "POINT(lng lat)"
     Returns: (latitude, longitude)
     """
-    # Remove "POINT(" and ")"
-    coords = point_str.replace("POINT(", "").replace(")", "")
-    lng, lat = map(float, coords.split())
-    return (lat, lng)
+    # Slice off the fixed "POINT(" prefix and ")" suffix and split on the
+    # single separator — one substring per coordinate instead of two
+    # full-string .replace() copies plus a list from .split() per row
+    coords = point_str[6:-1]
+    sp = coords.find(" ")
+    return (float(coords[sp + 1:]), float(coords[:sp]))
 
 def is_within_service_area(
     point: Tuple[float, float],
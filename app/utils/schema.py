@@ -0,0 +1,19 @@
+from typing import Type, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T", bound=BaseModel)
+
+def construct_trusted(schema: Type[T], obj) -> T:
+    """
+    Build a response schema from a trusted ORM row without validation.
+
+    Rows coming back from our own database were validated when they were
+    written; re-running the full validator chain per row just burns CPU on
+    list-heavy endpoints. model_construct copies the attributes straight in.
+    Only ever use this with ORM instances — request payloads must keep going
+    through model_validate.
+    """
+    return schema.model_construct(
+        **{name: getattr(obj, name) for name in schema.model_fields}
+    )
@@ -237,7 +237,14 @@ CREATE TABLE promo_codes (
 );
 
 -- Indexes for performance
+-- GiST geography indexes: the matching query filters with
+-- ST_DWithin(current_location::geography, ...) and orders by geography KNN,
+-- and only a GiST index on the geography type serves both (SP-GiST has no
+-- geography opclass; an expression index on the geometry cast matches
+-- neither predicate).
 CREATE INDEX idx_drivers_location ON drivers USING GIST(current_location);
+CREATE INDEX idx_tow_requests_pickup_location ON tow_requests USING GIST(pickup_location);
+CREATE INDEX idx_tow_requests_dropoff_location ON tow_requests USING GIST(dropoff_location);
 CREATE INDEX idx_drivers_online ON drivers(is_online) WHERE is_online = TRUE;
 CREATE INDEX idx_tow_requests_status ON tow_requests(status);
 CREATE INDEX idx_tow_requests_customer ON tow_requests(customer_id);